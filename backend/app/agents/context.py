@@ -0,0 +1,133 @@
+import json
+from typing import Any, Dict, List
+from app.state.models import RentalSession, ConversationMessage
+from app.core.config import settings
+
+def estimate_tokens(text: str | None) -> int:
+    """Cheap token estimate (~4 chars/token for English + JSON). No tokenizer dependency."""
+    return len(text) // 4 + 1 if text else 0
+
+def _message_tokens(msg: Dict[str, Any]) -> int:
+    tokens = 4  # per-message overhead (role, separators)
+    tokens += estimate_tokens(msg.get("content"))
+    if "tool_calls" in msg:
+        tokens += estimate_tokens(json.dumps(msg["tool_calls"]))
+    return tokens
+
+def render_message(m: ConversationMessage) -> Dict[str, Any]:
+    msg_dict = {"role": m.role}
+    if m.content:
+        msg_dict["content"] = m.content
+    if m.tool_calls:
+        msg_dict["tool_calls"] = m.tool_calls
+    if m.tool_call_id:
+        msg_dict["tool_call_id"] = m.tool_call_id
+    return msg_dict
+
+class ConversationContext:
+    """
+    LLM message list for one session, maintained incrementally and kept under a token budget.
+
+    History is consumed append-only: each sync() renders only the messages added since the
+    previous call. Messages are grouped into turns (a user message and everything after it).
+    Once a turn is no longer the latest one, its tool payloads are truncated; when the total
+    still exceeds the budget, the oldest turns are evicted whole (so tool calls and their
+    results are never split) and replaced by a short summary note that also carries the
+    latest search filters.
+    """
+
+    def __init__(self, token_budget: int, old_tool_chars: int):
+        self.token_budget = token_budget
+        self.old_tool_chars = old_tool_chars
+        self.turns: List[List[Dict[str, Any]]] = []
+        self.turn_tokens: List[int] = []
+        self.synced = 0
+        self.tokens = 0  # tokens currently kept
+        self.history_tokens = 0  # tokens the full, untrimmed history would cost
+        self.evicted_turns = 0
+        self.evicted_requests: List[str] = []
+        self.active_search: Dict[str, Any] | None = None
+
+    def sync(self, history: List[ConversationMessage]) -> None:
+        for m in history[self.synced:]:
+            self._append(m)
+        self.synced = len(history)
+
+    def _append(self, m: ConversationMessage) -> None:
+        if m.role == "user" or not self.turns:
+            if self.turns:
+                self._compact_turn(len(self.turns) - 1)
+            self.turns.append([])
+            self.turn_tokens.append(0)
+
+        # Remember the latest search so it survives eviction of the turn that ran it
+        for tc in m.tool_calls or []:
+            function = tc.get("function") or {}
+            if function.get("name") == "search_listings":
+                try:
+                    self.active_search = json.loads(function.get("arguments") or "{}")
+                except json.JSONDecodeError:
+                    pass
+
+        msg = render_message(m)
+        tokens = _message_tokens(msg)
+        self.turns[-1].append(msg)
+        self.turn_tokens[-1] += tokens
+        self.tokens += tokens
+        self.history_tokens += tokens
+
+    def _compact_turn(self, index: int) -> None:
+        """Truncate tool payloads of a turn that is no longer the latest."""
+        turn = self.turns[index]
+        for i, msg in enumerate(turn):
+            content = msg.get("content")
+            if msg["role"] != "tool" or not content or len(content) <= self.old_tool_chars:
+                continue
+            # Replace rather than mutate: earlier message lists may still reference the old dict
+            turn[i] = {**msg, "content": content[:self.old_tool_chars] + " ...[truncated]"}
+            saved = _message_tokens(msg) - _message_tokens(turn[i])
+            self.turn_tokens[index] -= saved
+            self.tokens -= saved
+
+    def _evict_oldest_turn(self) -> None:
+        turn = self.turns.pop(0)
+        self.tokens -= self.turn_tokens.pop(0)
+        self.evicted_turns += 1
+        if turn and turn[0]["role"] == "user" and turn[0].get("content"):
+            self.evicted_requests.append(turn[0]["content"][:200])
+            self.evicted_requests = self.evicted_requests[-settings.CONTEXT_MAX_SUMMARY_ITEMS:]
+
+    def _summary_note(self) -> Dict[str, Any] | None:
+        if not self.evicted_turns:
+            return None
+        lines = [f"Earlier conversation ({self.evicted_turns} turns) was trimmed to save context."]
+        if self.evicted_requests:
+            lines.append("Earlier user requests: " + " | ".join(self.evicted_requests))
+        if self.active_search is not None:
+            lines.append("Current search filters: " + json.dumps(self.active_search))
+        return {"role": "system", "content": "\n".join(lines)}
+
+    def messages(self, system_prompt: str) -> List[Dict[str, Any]]:
+        budget = self.token_budget - estimate_tokens(system_prompt)
+        # Never evict the current (last) turn
+        while self.tokens > budget and len(self.turns) > 1:
+            self._evict_oldest_turn()
+
+        msgs = [{"role": "system", "content": system_prompt}]
+        note = self._summary_note()
+        if note:
+            msgs.append(note)
+        for turn in self.turns:
+            msgs.extend(turn)
+        return msgs
+
+def get_conversation_context(session: RentalSession) -> ConversationContext:
+    """Return the session's context, (re)building it if history was rewritten, not appended."""
+    context = session._context
+    if context is None or context.synced > len(session.conversation_history):
+        context = ConversationContext(
+            settings.CONTEXT_TOKEN_BUDGET, settings.CONTEXT_OLD_TOOL_CHARS
+        )
+        session._context = context
+    context.sync(session.conversation_history)
+    return context
@@ -1,156 +1,285 @@
+import asyncio
 import json
+import time
 import structlog
-from typing import List, Dict, Any
+from typing import AsyncIterator, Dict, Any
 from app.state.models import RentalSession, ConversationMessage
-from app.tools.search import SearchListingsTool
-from app.tools.listings import GetListingDetailsTool
+from app.tools.registry import get_tool_registry
+from app.tools.base import ToolResult, encode_json
+from app.services.llm import get_llm_client
 from app.core.config import settings
-from openai import AsyncOpenAI
+from app.agents.context import get_conversation_context
+from app.core.metrics import (
+    timed, STAGE_SECONDS, TOOL_SECONDS, TOOL_CALLS_TOTAL, TURN_SECONDS, TURNS_TOTAL,
+    TURNS_IN_FLIGHT, TIME_TO_FIRST_RESULT_SECONDS, TIME_TO_FIRST_TOKEN_SECONDS,
+)
 
 logger = structlog.get_logger()
 
+SYSTEM_PROMPT = """You are Havena, an advanced AI Rental Agent.
+        
+        CAPABILITIES:
+        1. Search: You can search by price, beds, baths, location, and specific amenities (pets, parking, laundry, AC).
+        2. Vibe: You can filter by 'vibe score' (0-5) or semantic queries like "quiet", "sunny", "safe".
+        3. Details: You can retrieve full details for a specific listing using 'get_listing_details'.
+        
+        BEHAVIOR:
+        - STATEFUL SEARCH: If the user says "make it cheaper" or "add parking", you must CALL search_listings AGAIN with the new filters merged with the previous ones.
+        - TOKEN EFFICIENCY: The search tool returns a summary to you. Trust that the full list is shown to the user in the UI.
+        - COMPARISON: If asked to compare, fetch details for the relevant listings and give a side-by-side analysis.
+        - COMMUTE: To find listings near a workplace, school or transit stop, pass its
+          coordinates as near_latitude/near_longitude (plus radius_km); results then include
+          distance_km. You can also discuss transport scores and nearby transit if available in
+          the description/metadata.
+        
+        When replying, be concise, helpful, and professional.
+        """
+
 class RentalAgent:
+    """
+    Stateless per turn (all conversation state lives on RentalSession), so one
+    instance is shared by every connection - see get_agent().
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
-        self.tools = {
-            "search_listings": SearchListingsTool(),
-            "get_listing_details": GetListingDetailsTool()
-        }
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = "gpt-4o" # or gpt-4-turbo
+        self.registry = get_tool_registry()
+        self.tools = self.registry.tools
+        self.model = settings.LLM_MODEL
+
+    @property
+    def client(self):
+        # Looked up per use, not kept: shutdown closes the shared client and a later lifespan
+        # (tests, embedded servers) creates a new one
+        return get_llm_client()
 
     async def run_turn(self, session: RentalSession, user_message: str | None = None) -> Dict[str, Any]:
         """
-        Run a turn of the conversation.
+        Run a turn of the conversation and return the aggregated result.
+        Non-streaming wrapper around stream_turn().
+        """
+        response: Dict[str, Any] = {"role": "assistant", "content": None}
+        async for event in self.stream_turn(session, user_message):
+            if event["type"] == "tool_call":
+                response.setdefault("tool_calls", []).append(
+                    {"name": event["tool_name"], "arguments": event["arguments"]}
+                )
+            elif event["type"] == "tool_result":
+                response.setdefault("tool_results", []).append(
+                    {"name": event["tool_name"], "result": event["result"]}
+                )
+            elif event["type"] == "message":
+                response["content"] = event["content"]
+        return response
+
+    async def stream_turn(self, session: RentalSession,
+                          user_message: str | None = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a turn of the conversation, yielding frontend events as they happen:
+        - {"type": "delta", "content": ...}                       assistant tokens as they stream
+        - {"type": "tool_call", "tool_name": ..., "arguments": ...}
+        - {"type": "tool_result", "tool_name": ..., "result": ..., "encoded": ToolResult}
+          as soon as each tool finishes; "encoded" is the result encoded once, for the WebSocket
+        - {"type": "message", "role": "assistant", "content": ...}  final text, once
         If user_message is provided, it's added to history.
-        Recursively handles tool calls.
+        Loops through LLM -> tools -> LLM until the model answers without tool calls.
         """
+        started = time.perf_counter()
+        first_result = first_token = True
+        outcome = "error"
+        TURNS_IN_FLIGHT.inc()
+        try:
+            async for event in self._turn_events(session, user_message):
+                if first_result and event["type"] == "tool_result":
+                    first_result = False
+                    TIME_TO_FIRST_RESULT_SECONDS.observe(time.perf_counter() - started)
+                elif first_token and event["type"] == "delta":
+                    first_token = False
+                    TIME_TO_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+                yield event
+            outcome = "ok"
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        finally:
+            TURNS_IN_FLIGHT.dec()
+            TURN_SECONDS.observe(time.perf_counter() - started)
+            TURNS_TOTAL.inc(outcome=outcome)
+
+    async def _turn_events(
+        self, session: RentalSession, user_message: str | None
+    ) -> AsyncIterator[Dict[str, Any]]:
         if user_message:
             session.conversation_history.append(ConversationMessage(role="user", content=user_message))
         
-        # Build messages for LLM
-        messages = self._build_ops_messages(session)
-        
-        # Define Tools
-        tools_schema = [t.to_openai_function_schema() for t in self.tools.values()]
-        
-        logger.info("Calling LLM", model=self.model)
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            tools=tools_schema,
-            tool_choice="auto"
-        )
-        
-        message = response.choices[0].message
-        
-        # Update history with Assistant message
-        session.conversation_history.append(ConversationMessage(
-            role="assistant",
-            content=message.content,
-            tool_calls=[tc.model_dump() for tc in message.tool_calls] if message.tool_calls else None
-        ))
-        
-        # Handle Tool Calls
-        if message.tool_calls:
-            logger.info("Processing tool calls", count=len(message.tool_calls))
-            tool_results = []
+        while True:
+            # Build messages for LLM (incremental, token-budgeted)
+            with timed("context_build"):
+                context = get_conversation_context(session)
+                messages = context.messages(SYSTEM_PROMPT)
             
-            for tool_call in message.tool_calls:
-                function_name = tool_call.function.name
-                arguments = json.loads(tool_call.function.arguments)
-                
-                tool_instance = self.tools.get(function_name)
-                if tool_instance:
-                    logger.info(f"Executing tool: {function_name}", args=arguments)
-                    raw_result = await tool_instance.execute(**arguments)
-                    
-                    # Sanitize result (convert datetimes to strings) for both LLM and Frontend
-                    result_str = json.dumps(raw_result, default=str)
-                    result = json.loads(result_str)
-                    
-                    # Special handling for search_listings to save tokens & force re-search behavior
-                    if function_name == "search_listings":
-                        count = len(result)
-                        # We expressly hide details from the LLM so it DOES NOT answer based on stale/partial data.
-                        # It must use tools to get details or refine search.
-                        summary = f"Found {count} listings. (full results being rendered in UI)"
-                        history_content = json.dumps({"summary": summary}, default=str)
-                    else:
-                        # Standard handling for other tools
-                        history_content = json.dumps(result, default=str)
-
-                    # Store result in history (Optimized)
-                    session.conversation_history.append(ConversationMessage(
-                        role="tool",
-                        content=history_content,
-                        tool_call_id=tool_call.id,
-                        name=function_name
-                    ))
-                    
-                    # For the frontend, pass the FULL result
-                    tool_results.append({
-                        "name": function_name,
-                        "result": result # Send full list to UI (including all 50 items)
+            logger.info(
+                "Calling LLM",
+                model=self.model,
+                prompt_tokens_est=context.tokens,
+                history_tokens_est=context.history_tokens,
+                evicted_turns=context.evicted_turns
+            )
+            llm_started = time.perf_counter()
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=self.registry.schemas,
+                tool_choice="auto",
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            content_parts = []
+            partial_calls: Dict[int, Dict[str, Any]] = {}
+            first_chunk = True
+            async for chunk in stream:
+                if first_chunk:
+                    first_chunk = False
+                    llm_first_chunk = time.perf_counter() - llm_started
+                    STAGE_SECONDS.observe(llm_first_chunk, stage="llm_first_chunk")
+                if chunk.usage:
+                    logger.info(
+                        "LLM usage",
+                        prompt_tokens=chunk.usage.prompt_tokens,
+                        completion_tokens=chunk.usage.completion_tokens
+                    )
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield {"type": "delta", "content": delta.content}
+                # Tool calls arrive as fragments keyed by index; stitch them together
+                for tc in delta.tool_calls or []:
+                    call = partial_calls.setdefault(tc.index, {
+                        "id": None, "type": "function", "function": {"name": "", "arguments": ""}
                     })
-                else:
-                    logger.error(f"Tool not found: {function_name}")
+                    if tc.id:
+                        call["id"] = tc.id
+                    if tc.function and tc.function.name:
+                        call["function"]["name"] += tc.function.name
+                    if tc.function and tc.function.arguments:
+                        call["function"]["arguments"] += tc.function.arguments
+            # Includes time the consumer spends between deltas (e.g. socket writes)
+            STAGE_SECONDS.observe(time.perf_counter() - llm_started, stage="llm_call")
             
-            # Recursive call with tool results
-            final_response = await self.run_turn(session, user_message=None)
+            content = "".join(content_parts) or None
+            tool_calls = [partial_calls[i] for i in sorted(partial_calls)]
             
-            # Merge tool info for frontend display
-            if "tool_results" not in final_response:
-                final_response["tool_results"] = []
-            final_response["tool_results"].extend(tool_results)
+            # Update history with Assistant message
+            session.conversation_history.append(ConversationMessage(
+                role="assistant",
+                content=content,
+                tool_calls=tool_calls or None
+            ))
             
-            # Also merge current turn's tool calls
-            tool_calls_data = [
-                {"name": tc.function.name, "arguments": json.loads(tc.function.arguments)} 
-                for tc in message.tool_calls
-            ]
-            if "tool_calls" not in final_response:
-                final_response["tool_calls"] = []
-            final_response["tool_calls"].extend(tool_calls_data)
+            if not tool_calls:
+                # Final text response
+                yield {"type": "message", "role": "assistant", "content": content}
+                return
             
-            return final_response
-
-        else:
-            # Final text response
-            return {
-                "role": "assistant",
-                "content": message.content
-            }
+            # Handle Tool Calls
+            logger.info("Processing tool calls", count=len(tool_calls))
+            for tool_call in tool_calls:
+                yield {
+                    "type": "tool_call",
+                    "tool_name": tool_call["function"]["name"],
+                    "arguments": json.loads(tool_call["function"]["arguments"] or "{}")
+                }
+            
+            # Independent tool calls run concurrently (bounded). Each result is streamed
+            # to the UI as soon as it finishes; history is appended in tool_call order.
+            semaphore = asyncio.Semaphore(settings.TOOL_CONCURRENCY)
+            
+            async def run_indexed(index, tool_call):
+                return index, await self._execute_tool_call(tool_call, semaphore)
+            
+            tasks = [asyncio.create_task(run_indexed(i, tc)) for i, tc in enumerate(tool_calls)]
+            outcomes = [None] * len(tool_calls)
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, outcome = await next_done
+                    outcomes[index] = outcome
+                    if outcome is not None:
+                        # For the frontend, pass the FULL result (already encoded once)
+                        tool_result = outcome[1]
+                        yield {
+                            "type": "tool_result",
+                            "tool_name": tool_result.tool_name,
+                            "result": tool_result.value,
+                            "encoded": tool_result
+                        }
+            finally:
+                for task in tasks:
+                    task.cancel()
+            
+            for tool_call, outcome in zip(tool_calls, outcomes):
+                if outcome is None:
+                    continue
+                history_content, _ = outcome
+                
+                # Store result in history (Optimized)
+                session.conversation_history.append(ConversationMessage(
+                    role="tool",
+                    content=history_content,
+                    tool_call_id=tool_call["id"],
+                    name=tool_call["function"]["name"]
+                ))
 
-    def _build_ops_messages(self, session: RentalSession) -> List[Dict[str, Any]]:
-        system_prompt = """You are Havena, an advanced AI Rental Agent.
+    async def _execute_tool_call(self, tool_call, semaphore: asyncio.Semaphore):
+        """Run one tool call. Returns (history_content, ToolResult), None if the tool is unknown."""
+        function_name = tool_call["function"]["name"]
+        arguments = json.loads(tool_call["function"]["arguments"] or "{}")
         
-        CAPABILITIES:
-        1. Search: You can search by price, beds, baths, location, and specific amenities (pets, parking, laundry, AC).
-        2. Vibe: You can filter by 'vibe score' (0-5) or semantic queries like "quiet", "sunny", "safe".
-        3. Details: You can retrieve full details for a specific listing using 'get_listing_details'.
+        tool_instance = self.tools.get(function_name)
+        if not tool_instance:
+            logger.error(f"Tool not found: {function_name}")
+            return None
         
-        BEHAVIOR:
-        - STATEFUL SEARCH: If the user says "make it cheaper" or "add parking", you must CALL search_listings AGAIN with the new filters merged with the previous ones.
-        - TOKEN EFFICIENCY: The search tool returns a summary to you. Trust that the full list is shown to the user in the UI.
-        - COMPARISON: If asked to compare, fetch details for the relevant listings and give a side-by-side analysis.
-        - COMMUTE: You can discuss transport scores and nearby transit if available in the description/metadata.
+        TOOL_CALLS_TOTAL.inc(tool=function_name)
+        started = time.perf_counter()
+        async with semaphore:
+            logger.info(f"Executing tool: {function_name}", args=arguments)
+            raw_result = await tool_instance.execute(**arguments)
+        elapsed = time.perf_counter() - started
+        TOOL_SECONDS.observe(elapsed, tool=function_name)
+        logger.info(f"Tool finished: {function_name}", duration_ms=round(elapsed * 1000, 2))
         
-        When replying, be concise, helpful, and professional.
-        """
+        # Encode once (datetimes -> strings); the payload serves both LLM history and Frontend
+        with timed("tool_result_serialize"):
+            result = ToolResult(function_name, raw_result, tool_instance.per_query_fields)
         
-        msgs = [{"role": "system", "content": system_prompt}]
+        # Special handling for search_listings to save tokens & force re-search behavior
+        if function_name == "search_listings" and isinstance(raw_result, list):
+            count = len(raw_result)
+            # We expressly hide details from the LLM so it DOES NOT answer based on
+            # stale/partial data. It must use tools to get details or refine search.
+            summary = f"Found {count} listings. (full results being rendered in UI)"
+            requested = arguments.get("limit") or settings.SEARCH_DEFAULT_LIMIT
+            page_size = min(requested, settings.SEARCH_MAX_LIMIT)
+            if count >= page_size:
+                next_offset = (arguments.get("offset") or 0) + count
+                summary += (
+                    f" More results available: repeat the search with offset={next_offset} to page."
+                )
+            history_content = encode_json({"summary": summary})
+        else:
+            # Standard handling for other tools
+            history_content = result.payload
         
-        for m in session.conversation_history:
-            msg_dict = {"role": m.role}
-            if m.content:
-                msg_dict["content"] = m.content
-            if m.tool_calls:
-                msg_dict["tool_calls"] = m.tool_calls
-            if m.tool_call_id:
-                msg_dict["tool_call_id"] = m.tool_call_id
-            # 'name' is not strictly required for tool role in some API versions but good to have
-            if m.role == "tool" and m.name:
-                pass 
-            msgs.append(msg_dict)
-            
-        return msgs
+        return history_content, result
+
+def get_agent():
+    return RentalAgent.get_instance()
@@ -1,16 +1,45 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import PlainTextResponse
 from app.state.models import RentalSession
-from app.agents.planner import RentalAgent
+from app.state.store import get_session_store
+from app.agents.planner import get_agent
+from app.tools.search import get_search_cache
+from app.services.embedding_batcher import get_embedding_batcher
+from app.services.embeddings import EmbeddingService
+from app.tools.base import SentListings, encode_json
+from app.core.config import settings
+from app.core.metrics import REGISTRY, WS_BYTES_SENT, WS_LISTINGS_REUSED, register_callback, timed
+import asyncio
+import time
 import uuid
 import structlog
 import json
-from typing import Dict
 
 router = APIRouter()
 logger = structlog.get_logger()
 
-# In-memory session storage for MVP
-sessions: Dict[str, RentalSession] = {}
+# Bounded/evicting (optionally SQLite-persisted) session storage. Its calls block (SQLite I/O,
+# session (de)serialization), so handlers run them off the event loop.
+sessions = get_session_store()
+
+# Scrape-time views of counters that live on the caches/stores themselves.
+# A callback that raises (e.g. embedding model not loaded yet) is simply omitted.
+register_callback("rentalagent_sessions", "Sessions held in memory by the session store",
+                  sessions.resident_count)
+register_callback("rentalagent_search_cache_hits_total", "Search result cache hits",
+                  lambda: get_search_cache().stats()["hits"], type="counter")
+register_callback("rentalagent_search_cache_misses_total", "Search result cache misses",
+                  lambda: get_search_cache().stats()["misses"], type="counter")
+register_callback("rentalagent_embedding_cache_hits_total",
+                  "In-memory query embedding cache hits",
+                  lambda: EmbeddingService._instance.cache_stats()["memory"]["hits"],
+                  type="counter")
+register_callback("rentalagent_embedding_cache_misses_total",
+                  "In-memory query embedding cache misses",
+                  lambda: EmbeddingService._instance.cache_stats()["memory"]["misses"],
+                  type="counter")
+register_callback("rentalagent_embedding_batches_total", "Micro-batched encode() calls",
+                  lambda: get_embedding_batcher().batches, type="counter")
 
 class CreateSessionRequest(json.JSONDecoder): # Pydantic model needed here usually
     pass 
@@ -22,21 +51,48 @@ class SessionCreate(BaseModel):
 @router.post("/sessions")
 async def create_session(request: SessionCreate):
     session = RentalSession()
-    sessions[session.session_id] = session
+    await asyncio.get_running_loop().run_in_executor(None, sessions.put, session)
     return {"session_id": session.session_id}
 
+@router.get("/stats")
+async def get_stats():
+    """Cache hit rates and store sizes."""
+    embedding_service = EmbeddingService._instance  # don't load the model just to report stats
+    return {
+        "search_cache": get_search_cache().stats(),
+        "embedding_cache": embedding_service.cache_stats() if embedding_service else None,
+        "embedding_batcher": get_embedding_batcher().stats(),
+        "sessions": await asyncio.get_running_loop().run_in_executor(None, sessions.stats),
+    }
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition: stage latency histograms, turn/tool counters, cache gauges."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @router.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
     logger.info(f"WebSocket connected: {session_id}")
     
-    session = sessions.get(session_id)
+    loop = asyncio.get_running_loop()
+    session = await loop.run_in_executor(None, sessions.get, session_id)
     if not session:
         # Create ad-hoc if missing (dev convenience)
         session = RentalSession(session_id=session_id)
-        sessions[session_id] = session
+        await loop.run_in_executor(None, sessions.put, session)
     
-    agent = RentalAgent()
+    agent = get_agent()
+    # Listing payloads already sent on this connection; later results reference them by id
+    sent_listings = (
+        SentListings(settings.WS_SENT_LISTINGS_MAX) if settings.WS_DELTA_RESULTS else None
+    )
+
+    async def send(frame_type: str, text: str) -> int:
+        size = len(text.encode())
+        WS_BYTES_SENT.inc(size, type=frame_type)
+        await websocket.send_text(text)
+        return size
 
     try:
         while True:
@@ -47,34 +103,49 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 user_content = data.get("content")
                 
                 # Notify "thinking"
-                await websocket.send_json({"type": "status", "message": "Thinking..."})
-                
-                # Run Agent Turn
-                response = await agent.run_turn(session, user_content)
+                status = {"type": "status", "message": "Thinking..."}
+                bytes_sent = await send("status", encode_json(status))
                 
-                # Send Tool Calls/Results separate or inside response
-                if "tool_calls" in response:
-                     for tc in response["tool_calls"]:
-                         await websocket.send_json({
-                             "type": "tool_call", 
-                             "tool_name": tc.get("name"), 
-                             "arguments": tc.get("arguments")
-                         })
+                # Stream the turn: tool calls/results and assistant tokens are
+                # forwarded the moment the agent produces them.
+                turn_started = time.perf_counter()
+                first_result_ms = None
+                first_token_ms = None
+                reused_before = sent_listings.reused if sent_listings else 0
+                async for event in agent.stream_turn(session, user_content):
+                    elapsed_ms = (time.perf_counter() - turn_started) * 1000
+                    if event["type"] == "tool_result" and first_result_ms is None:
+                        first_result_ms = elapsed_ms
+                    elif event["type"] == "delta" and first_token_ms is None:
+                        first_token_ms = elapsed_ms
+                    if event["type"] == "tool_result":
+                        # Tool results arrive pre-encoded; don't serialize them a second time
+                        result = event["encoded"]
+                        frame = sent_listings.frame(result) if sent_listings else result.frame
+                    else:
+                        frame = encode_json(event)
+                    bytes_sent += await send(event["type"], frame)
+                listings_reused = (sent_listings.reused if sent_listings else 0) - reused_before
+                WS_LISTINGS_REUSED.inc(listings_reused)
                 
-                if "tool_results" in response:
-                    for tr in response["tool_results"]:
-                        await websocket.send_json({
-                            "type": "tool_result",
-                            "tool_name": tr.get("name"),
-                            "result": tr.get("result")
-                        })
+                # Persist / refresh LRU position after every turn. Awaited, so the next turn
+                # can't mutate the session while it is being serialized.
+                with timed("session_persist"):
+                    await loop.run_in_executor(None, sessions.put, session)
                 
-                # Send Final Response
-                await websocket.send_json({
-                    "type": "message",
-                    "role": "assistant",
-                    "content": response.get("content")
-                })
+                logger.info(
+                    "Turn complete",
+                    session_id=session_id,
+                    time_to_first_result_ms=(
+                        round(first_result_ms, 1) if first_result_ms is not None else None
+                    ),
+                    time_to_first_token_ms=(
+                        round(first_token_ms, 1) if first_token_ms is not None else None
+                    ),
+                    total_ms=round((time.perf_counter() - turn_started) * 1000, 1),
+                    bytes_sent=bytes_sent,
+                    listings_reused=listings_reused
+                )
                 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: {session_id}")
@@ -4,8 +4,88 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str | None = None
     ANTHROPIC_API_KEY: str | None = None
     LANCEDB_URI: str = "data/lancedb"
+    TABLE_REFRESH_INTERVAL: float = 5.0  # seconds between checks for a newer table version
     LOG_LEVEL: str = "INFO"
 
+    # Embeddings
+    EMBEDDING_CACHE_SIZE: int = 1024  # in-memory LRU entries for query embeddings (0 disables)
+    EMBEDDING_CACHE_PATH: str | None = None  # optional SQLite file for a persistent cache tier
+    EMBEDDING_CACHE_MAX_ROWS: int = 50_000  # LRU bound of that file (~4 KB per 1024-dim vector)
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0  # queries arriving within this window share one encode()
+    EMBEDDING_MAX_BATCH: int = 32
+    EMBEDDING_QUEUE_SIZE: int = 256  # pending query embeddings before callers wait
+    EMBEDDING_TORCH_THREADS: int | None = None  # encoder intra-op threads (default: torch's choice)
+    EMBEDDING_BACKEND: str = "torch"  # torch, torch-int8 (dynamic quantization) or onnx
+    EMBEDDING_MODEL_PATH: str | None = None  # local/exported model copy (default: the hub model)
+    EMBEDDING_ONNX_FILE: str | None = None  # onnx only, e.g. "onnx/model_qint8_avx512_vnni.onnx"
+
+    # Vector index (ANN)
+    VECTOR_INDEX_TYPE: str = "IVF_PQ"  # IVF_PQ or IVF_HNSW_SQ
+    VECTOR_INDEX_METRIC: str = "l2"
+    VECTOR_INDEX_MIN_ROWS: int = 5000  # below this, brute-force search is fast enough
+    VECTOR_INDEX_PARTITIONS: int | None = None  # default: sqrt(row count)
+    VECTOR_INDEX_SUB_VECTORS: int = 64  # IVF_PQ only; must divide the vector dimension (1024)
+
+    # Compact vectors (app/db/compact.py): PCA-reduced copy of `vector` searched first, then
+    # exact rerank. Dimension e.g. 128, fitted on full rebuilds; None searches `vector` directly
+    VECTOR_COMPACT_DIM: int | None = None
+    VECTOR_COMPACT_FIT_SAMPLE: int = 20000  # embedded rows the projection is fitted on
+    VECTOR_COMPACT_RERANK: int = 100  # compact-stage candidates rescored against the full vectors
+    # Compact vectors are small already; PQ on top costs recall
+    VECTOR_COMPACT_INDEX_TYPE: str = "IVF_FLAT"
+
+    # Search
+    SEARCH_NPROBES: int = 20
+    SEARCH_REFINE_FACTOR: int | None = 10
+    SEARCH_DEFAULT_LIMIT: int = 50
+    SEARCH_MAX_LIMIT: int = 200
+    # Deepest page: rankings are paged from a shortlist of SEARCH_MAX_OFFSET + SEARCH_MAX_LIMIT
+    SEARCH_MAX_OFFSET: int = 300
+    # Nearest neighbours re-ranked when a vector query sorts by price/date
+    SEARCH_CANDIDATE_POOL: int = 200
+    # Cached search_listings results (0 disables); flushed on table version change
+    SEARCH_CACHE_SIZE: int = 512
+    SEARCH_RRF_K: int = 60  # reciprocal rank fusion constant for hybrid (BM25 + vector) search
+    SEARCH_DEFAULT_RADIUS_KM: float = 2.0  # when a search gives a center point but no radius_km
+
+    # Geo (app/db/geo.py)
+    # Geohash length stored per listing (6: ~1.2 x 0.6 km cells); changing it needs a full rebuild
+    GEO_CELL_PRECISION: int = 6
+    # geo_cell index budget per radius/box filter (cells); larger areas are scanned
+    GEO_MAX_CELLS: int = 20
+
+    # LLM
+    OPENAI_BASE_URL: str | None = None  # e.g. a local OpenAI-compatible server
+    LLM_MODEL: str = "gpt-4o"
+    LLM_TIMEOUT: float = 60.0
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 60.0  # seconds an idle pooled connection is kept open
+
+    # Agent
+    TOOL_CONCURRENCY: int = 4  # max tool calls from one assistant message executed at once
+    CONTEXT_TOKEN_BUDGET: int = 8000  # estimated prompt tokens sent to the LLM per call
+    CONTEXT_OLD_TOOL_CHARS: int = 600  # tool payloads from earlier turns are truncated to this
+    CONTEXT_MAX_SUMMARY_ITEMS: int = 10  # evicted user requests listed in the summary note
+
+    # Sessions
+    SESSION_STORE: str = "memory"  # memory | sqlite
+    SESSION_SQLITE_PATH: str = "data/sessions.sqlite3"
+    SESSION_TTL_SECONDS: float = 7 * 24 * 3600
+    SESSION_MAX_ENTRIES: int = 10000  # in-memory (hot) sessions
+    SESSION_MAX_BYTES: int = 256 * 1024 * 1024  # approximate in-memory footprint
+    SESSION_COMPACT_AFTER_SECONDS: float = 600  # idle sessions are kept serialized + compressed
+
+    # WebSocket (app/api/routes.py)
+    # Listing results carry ids + only the payloads the client doesn't hold yet
+    WS_DELTA_RESULTS: bool = True
+    # Listings tracked per connection for delta results; evicted ones are re-sent
+    WS_SENT_LISTINGS_MAX: int = 5000
+
+    # Startup
+    STARTUP_WARMUP: bool = True  # load model/table in the background at startup (/ready waits)
+    STARTUP_WARMUP_QUERIES: bool = True  # also run a few searches to warm indexes and caches
+
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:5173"]
 
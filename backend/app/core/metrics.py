@@ -0,0 +1,191 @@
+"""
+Minimal Prometheus metrics (text exposition format 0.0.4) without a client-library dependency:
+labelled histograms, counters and gauges, plus callback metrics read at scrape time.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# Seconds; covers sub-millisecond cache hits up to slow multi-second LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(dict(zip(self.labelnames, k)))} {v}" for k, v in items]
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        lines = []
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, 'le': bound})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels({**labels, 'le': '+Inf'})
+            lines.append(f"{self.name}_bucket{inf_labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+class CallbackMetric(_Metric):
+    """Value read at scrape time (e.g. store sizes, cache counters kept elsewhere)."""
+
+    def __init__(self, name: str, help: str, type: str, fn: Callable[[], float]):
+        super().__init__(name, help)
+        self.type = type
+        self.fn = fn
+
+    def _samples(self) -> list[str]:
+        try:
+            return [f"{self.name} {float(self.fn())}"]
+        except Exception:
+            return []
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "rentalagent_stage_seconds",
+    "Time spent per pipeline stage (LLM call, embedding, search, serialization, ...)",
+    ("stage",),
+))
+TOOL_SECONDS = REGISTRY.register(Histogram(
+    "rentalagent_tool_seconds", "Tool execution time, including waiting for a concurrency slot",
+    ("tool",),
+))
+TURN_SECONDS = REGISTRY.register(Histogram("rentalagent_turn_seconds", "Total time per agent turn"))
+TIME_TO_FIRST_RESULT_SECONDS = REGISTRY.register(Histogram(
+    "rentalagent_time_to_first_result_seconds", "Time from turn start to the first tool result",
+))
+TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.register(Histogram(
+    "rentalagent_time_to_first_token_seconds",
+    "Time from turn start to the first streamed assistant token",
+))
+TURNS_TOTAL = REGISTRY.register(Counter(
+    "rentalagent_turns_total", "Agent turns by outcome", ("outcome",),
+))
+TOOL_CALLS_TOTAL = REGISTRY.register(Counter(
+    "rentalagent_tool_calls_total", "Tool calls by tool", ("tool",),
+))
+TURNS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "rentalagent_turns_in_flight", "Agent turns currently running",
+))
+TURNS_IN_FLIGHT.set(0)
+WS_BYTES_SENT = REGISTRY.register(Counter(
+    "rentalagent_ws_bytes_sent_total", "Bytes of WebSocket frames sent, by frame type", ("type",),
+))
+WS_LISTINGS_REUSED = REGISTRY.register(Counter(
+    "rentalagent_ws_listings_reused_total",
+    "Listings referenced by id in delta results instead of re-sent",
+))
+
+def register_callback(name: str, help: str, fn: Callable[[], float], type: str = "gauge") -> None:
+    REGISTRY.register(CallbackMetric(name, help, type, fn))
+
+@contextmanager
+def timed(stage: str, timings: dict | None = None):
+    """
+    Span-style timer: records the block's duration in rentalagent_stage_seconds{stage=...}
+    and, if given, into `timings` (milliseconds) so the caller can put it on its log line.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[f"{stage}_ms"] = round(elapsed * 1000, 2)
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from app.core.config import settings
+import structlog
+
+logger = structlog.get_logger()
+
+# Representative queries: exercise the encoder, the ANN index and the scalar-filter paths
+WARMUP_QUERIES = [
+    {"query": "bright apartment with parking"},
+    {"query": "quiet studio", "max_price": 3000, "pets_allowed": True},
+]
+
+class StartupState:
+    """
+    Startup progress for the readiness probe: per-stage timings (imports, model load,
+    table open, warm-up queries) and whether warm-up has finished.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.error: str | None = None
+        self.timings: dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = round(seconds, 3)
+        logger.info(f"Startup: {stage} took {seconds:.2f}s")
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else ("failed" if self.error else "warming_up"),
+            "error": self.error,
+            "timings": self.timings,
+        }
+
+_state: StartupState | None = None
+
+def get_startup_state() -> StartupState:
+    global _state
+    if _state is None:
+        _state = StartupState()
+    return _state
+
+async def warm_up() -> None:
+    """
+    Load everything the first request would otherwise pay for: the embedding model
+    (and its torch/ONNX imports), the LanceDB table handle, and one pass through the
+    search path. Blocking steps run in the default executor so /health stays responsive.
+    """
+    from app.agents.planner import get_agent
+    from app.db.client import get_lancedb_client
+    from app.services.embeddings import get_embedding_service
+    from app.tools.search import SearchListingsTool
+
+    state = get_startup_state()
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        with state.timed("agent"):
+            # Shared agent: LLM connection pool + tool schemas
+            get_agent()
+        with state.timed("embedding_model"):
+            await loop.run_in_executor(None, get_embedding_service)
+        with state.timed("table"):
+            await loop.run_in_executor(None, get_lancedb_client().get_table)
+        if settings.STARTUP_WARMUP_QUERIES:
+            with state.timed("warmup_queries"):
+                tool = SearchListingsTool()
+                for params in WARMUP_QUERIES:
+                    await tool.execute(limit=5, **params)
+        state.record("warm_up", time.perf_counter() - started)
+        state.ready = True
+        logger.info("Ready to serve")
+    except Exception as e:
+        state.error = str(e)
+        logger.error(f"Warm-up failed: {e}")
@@ -1,15 +1,48 @@
+import math
+import threading
+import time
 import lancedb
+import pyarrow as pa
+import pyarrow.compute as pc
+import structlog
 from lancedb.pydantic import pydantic_to_schema
 from app.core.config import settings
 from app.db.schemas import Listing
+from app.db.compact import COMPACT_COLUMN, VectorProjection, get_vector_projection
+
+logger = structlog.get_logger()
+
+def quote_literal(value: str) -> str:
+    """Quote a string for use in a LanceDB SQL filter."""
+    return "'" + str(value).replace("'", "''") + "'"
 
 class LanceDBClient:
     _instance = None
     _db = None
-    _table = None
 
     TABLE_NAME = "listings"
 
+    # Scalar indexes backing the filters built by SearchListingsTool and id lookups.
+    # BTREE for high-cardinality / range columns, BITMAP for low-cardinality ones.
+    SCALAR_INDEXES = {
+        "id": "BTREE",
+        "price": "BTREE",
+        "beds": "BTREE",
+        "baths": "BTREE",
+        "vibe_score": "BTREE",
+        "pets_allowed": "BITMAP",
+        "parking": "BITMAP",
+        "laundry": "BITMAP",
+        "air_conditioning": "BITMAP",
+        "city": "BITMAP",
+        "neighborhood": "BITMAP",
+        "is_active": "BITMAP",
+        "geo_cell": "BTREE",  # prefix ranges for radius/box filters (app/db/geo.py)
+    }
+
+    # Full-text (BM25) indexes for keyword / hybrid search
+    FTS_COLUMNS = ["title", "description"]
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
@@ -18,8 +51,53 @@ class LanceDBClient:
 
     def __init__(self):
         self._db = lancedb.connect(settings.LANCEDB_URI)
-        
+        self._table = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._fts_checked_version = None
+        self._fts_available = False
+        self._compact_checked_version = None
+        self._compact_dim = None
+        self._vocabulary_checked_version = None
+        self._vocabulary = frozenset()
+        self._columns_checked_version = None
+        self._column_names = frozenset()
+
     def get_table(self):
+        """
+        Return a cached table handle. At most every TABLE_REFRESH_INTERVAL seconds the
+        handle is moved to the latest dataset version, so writes from other processes
+        (e.g. the seed scripts dropping/recreating the table) are picked up without a
+        directory listing + open_table() on every call.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._table is None:
+                self._table = self._open_table()
+                self._checked_at = now
+            elif now - self._checked_at >= settings.TABLE_REFRESH_INTERVAL:
+                self._refresh()
+                self._checked_at = now
+            return self._table
+
+    def invalidate(self):
+        """Drop the cached handle; the next get_table() reopens the table."""
+        with self._lock:
+            self._table = None
+
+    def _refresh(self):
+        version = self._table.version
+        try:
+            self._table.checkout_latest()
+        except Exception as e:
+            logger.info(f"Reopening table after refresh failed: {e}")
+            self._table = self._open_table()
+        if self._table.version != version:
+            logger.info(
+                f"Table '{self.TABLE_NAME}' moved from version {version} to {self._table.version}"
+            )
+
+    def _open_table(self):
         if self.TABLE_NAME in self._db.table_names():
             return self._db.open_table(self.TABLE_NAME)
         
@@ -36,5 +114,198 @@ class LanceDBClient:
             exist_ok=True
         )
 
+    def recreate_table(self, rows: list[dict], compact_dim: int | None = None):
+        """
+        Replace the table with `rows` (full rebuilds). The schema comes from Listing, plus the
+        compact vector column when `compact_dim` is set, never from the rows: a first chunk
+        whose rows all lack e.g. coordinates would otherwise type those columns as null.
+        """
+        schema = pydantic_to_schema(Listing)
+        if compact_dim is not None:
+            schema = schema.append(pa.field(COMPACT_COLUMN, pa.list_(pa.float32(), compact_dim)))
+        data = pa.Table.from_pylist(rows, schema=schema)
+        table = self._db.create_table(self.TABLE_NAME, data, mode="overwrite")
+        self.invalidate()
+        return table
+
+    def ensure_schema(self) -> list[str]:
+        """
+        Add columns that exist on Listing but not on the table (e.g. a table created before
+        a field was introduced) as nullable columns, in place, without rewriting the table.
+        """
+        table = self.get_table()
+        existing = set(table.schema.names)
+        missing = [
+            field.with_nullable(True)
+            for field in pydantic_to_schema(Listing) if field.name not in existing
+        ]
+        if missing:
+            table.add_columns(missing)
+            added = [field.name for field in missing]
+            logger.info(f"Added columns to '{self.TABLE_NAME}': {added}")
+        return [field.name for field in missing]
+
+    def existing_columns(self, columns: list[str], table=None) -> list[str]:
+        """
+        `columns` minus those the table doesn't have, in order: a table built before a field
+        was added keeps serving reads until it is migrated (ensure_schema, run by the
+        seed/index scripts). Cached per table version.
+        """
+        table = table or self.get_table()
+        version = table.version
+        if version != self._columns_checked_version:
+            self._column_names = frozenset(table.schema.names)
+            self._columns_checked_version = version
+        return [column for column in columns if column in self._column_names]
+
+    def has_vector_index(self, table=None) -> bool:
+        table = table or self.get_table()
+        column = self.ann_column(table)
+        return any(idx.columns == [column] for idx in table.list_indices())
+
+    def compact_dim(self, table=None) -> int | None:
+        """Dimension of the table's compact vector column (None if absent), cached per version."""
+        table = table or self.get_table()
+        version = table.version
+        if version != self._compact_checked_version:
+            schema = table.schema
+            self._compact_dim = (
+                schema.field(COMPACT_COLUMN).type.list_size
+                if COMPACT_COLUMN in schema.names else None
+            )
+            self._compact_checked_version = version
+        return self._compact_dim
+
+    def get_compact_projection(self, table=None) -> VectorProjection | None:
+        """
+        The projection matching the table's compact vectors, or None when searches should
+        use the full `vector` column (no compact column, or no matching fitted projection).
+        """
+        dim = self.compact_dim(table)
+        if dim is None:
+            return None
+        projection = get_vector_projection()
+        if projection is None or projection.dim != dim:
+            logger.warning(f"'{COMPACT_COLUMN}' has no matching projection; searching full vectors")
+            return None
+        return projection
+
+    def ann_column(self, table=None) -> str:
+        """The column vector searches hit first, and so the one that gets the ANN index."""
+        return COMPACT_COLUMN if self.compact_dim(table) is not None else "vector"
+
+    def has_fts_index(self, table=None) -> bool:
+        """Whether every FTS_COLUMNS column has a full-text index. Cached per table version."""
+        table = table or self.get_table()
+        version = table.version
+        if version != self._fts_checked_version:
+            indexed = {
+                tuple(idx.columns) for idx in table.list_indices() if idx.index_type == "FTS"
+            }
+            self._fts_available = all((column,) in indexed for column in self.FTS_COLUMNS)
+            self._fts_checked_version = version
+        return self._fts_available
+
+    def place_names(self, table=None) -> frozenset[str]:
+        """Lower-cased city and neighborhood names in the table. Cached per table version."""
+        table = table or self.get_table()
+        version = table.version
+        if version != self._vocabulary_checked_version:
+            names = table.search().select(["city", "neighborhood"]).limit(None).to_arrow()
+            self._vocabulary = frozenset(
+                name.lower()
+                for column in names.columns
+                for name in pc.unique(column).to_pylist() if name
+            )
+            self._vocabulary_checked_version = version
+        return self._vocabulary
+
+    def create_vector_index(self, replace: bool = True, column: str | None = None) -> bool:
+        """
+        Build (or rebuild) the ANN index on `column`: by default `vector`, or the compact
+        vectors when the table has them (see ann_column). Call after ingest.
+        Small tables are skipped: brute force is exact and already fast there,
+        and IVF/PQ training needs a reasonable number of rows.
+        """
+        table = self.get_table()
+        row_count = table.count_rows()
+        if row_count < settings.VECTOR_INDEX_MIN_ROWS:
+            logger.info(
+                f"Skipping vector index: {row_count} rows "
+                f"< VECTOR_INDEX_MIN_ROWS={settings.VECTOR_INDEX_MIN_ROWS}"
+            )
+            return False
+        column = column or self.ann_column(table)
+        if not replace and any(idx.columns == [column] for idx in table.list_indices()):
+            return False
+
+        index_type = (
+            settings.VECTOR_COMPACT_INDEX_TYPE if column == COMPACT_COLUMN
+            else settings.VECTOR_INDEX_TYPE
+        )
+        num_partitions = settings.VECTOR_INDEX_PARTITIONS or max(1, int(math.sqrt(row_count)))
+        logger.info(
+            f"Building {index_type} index on '{column}'",
+            rows=row_count, num_partitions=num_partitions
+        )
+        kwargs = {}
+        if index_type.endswith("PQ"):
+            # Same dimensions per sub-vector as for the full 1024-dim vectors
+            dim = table.schema.field(column).type.list_size
+            kwargs["num_sub_vectors"] = max(1, settings.VECTOR_INDEX_SUB_VECTORS * dim // 1024)
+        table.create_index(
+            metric=settings.VECTOR_INDEX_METRIC,
+            num_partitions=num_partitions,
+            index_type=index_type,
+            vector_column_name=column,
+            replace=True,
+            **kwargs
+        )
+        logger.info("Vector index built")
+        return True
+
+    def create_scalar_indexes(self, replace: bool = True) -> list[str]:
+        """Create scalar indexes for filter columns so filters/id lookups avoid full scans."""
+        table = self.get_table()
+        existing = {tuple(idx.columns) for idx in table.list_indices()}
+        created = []
+        for column, index_type in self.SCALAR_INDEXES.items():
+            if not replace and (column,) in existing:
+                continue
+            table.create_scalar_index(column, index_type=index_type, replace=True)
+            created.append(column)
+        logger.info(f"Scalar indexes built: {created}")
+        return created
+
+    def create_fts_indexes(self, replace: bool = True) -> list[str]:
+        """Create BM25 full-text indexes on FTS_COLUMNS (native Lance FTS, no tantivy)."""
+        table = self.get_table()
+        existing = {tuple(idx.columns) for idx in table.list_indices() if idx.index_type == "FTS"}
+        created = []
+        for column in self.FTS_COLUMNS:
+            if not replace and (column,) in existing:
+                continue
+            table.create_fts_index(column, use_tantivy=False, replace=True)
+            created.append(column)
+        logger.info(f"Full-text indexes built: {created}")
+        return created
+
+    def build_indexes(self):
+        """(Re)build every index on the listings table. Call after ingest."""
+        self.create_scalar_indexes()
+        self.create_fts_indexes()
+        self.create_vector_index()
+
+    def update_indexes(self):
+        """
+        Cheaper alternative to build_indexes() after an incremental write: create any missing
+        index and fold new/updated rows into the existing ones (plus compaction) via optimize(),
+        without retraining the ANN index. The table stays readable throughout.
+        """
+        self.create_scalar_indexes(replace=False)
+        self.create_fts_indexes(replace=False)
+        self.get_table().optimize()
+        self.create_vector_index(replace=False)
+
 def get_lancedb_client():
     return LanceDBClient.get_instance()
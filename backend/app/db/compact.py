@@ -0,0 +1,97 @@
+import os
+import threading
+from pathlib import Path
+import numpy as np
+import structlog
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Reduced-dimension copy of `vector`, searched first; see SearchListingsTool._vector_candidates
+COMPACT_COLUMN = "vector_compact"
+
+class VectorProjection:
+    """
+    PCA projection of the 1024-dim embeddings onto their top `dim` principal components,
+    fitted with numpy at ingest. Distances between projected vectors approximate the full
+    ones well enough to shortlist candidates, which are then rescored exactly.
+    """
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)  # (dim, full_dim), orthonormal rows
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dim: int) -> "VectorProjection":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        mean = vectors.mean(axis=0)
+        centered = vectors - mean
+        # Eigenvectors of the (full_dim x full_dim) scatter matrix = principal axes. Unlike an
+        # SVD of the centered sample, the workspace doesn't grow with the number of rows.
+        scatter = (centered.T @ centered).astype(np.float64)
+        variance, axes = np.linalg.eigh(scatter)
+        variance, axes = variance[::-1].clip(min=0.0), axes[:, ::-1]  # largest variance first
+        explained = float(variance[:dim].sum() / variance.sum()) if variance.sum() else 1.0
+        logger.info(
+            f"Fitted {dim}-dim vector projection on {len(vectors)} rows, "
+            f"explained variance {explained:.3f}"
+        )
+        return cls(mean, axes[:, :dim].T)
+
+    def transform(self, vectors) -> np.ndarray:
+        """Project one vector (1-d) or a batch (2-d)."""
+        return (np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components.T
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a half-written file
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, mean=self.mean, components=self.components)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "VectorProjection":
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"])
+
+def projection_path() -> Path:
+    """The fitted projection lives next to the LanceDB tables it belongs to."""
+    return Path(settings.LANCEDB_URI) / f"{COMPACT_COLUMN}.npz"
+
+def exact_distances(vectors: np.ndarray, query: np.ndarray, metric: str) -> np.ndarray:
+    """Same distance LanceDB reports in `_distance` for `metric`."""
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        return 1.0 - (vectors @ query) / np.where(norms == 0, 1.0, norms)
+    if metric == "dot":
+        return 1.0 - vectors @ query
+    # l2: squared euclidean
+    return ((vectors - query) ** 2).sum(axis=1)
+
+_projection: VectorProjection | None = None
+_projection_mtime: float | None = None
+_projection_lock = threading.Lock()
+
+def get_vector_projection() -> VectorProjection | None:
+    """
+    The saved projection, or None if none was fitted. Reloaded when the file changes
+    (e.g. a full rebuild by the seed scripts in another process).
+    """
+    global _projection, _projection_mtime
+    path = projection_path()
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        _projection = _projection_mtime = None
+        return None
+    with _projection_lock:
+        if mtime != _projection_mtime:
+            _projection = VectorProjection.load(path)
+            _projection_mtime = mtime
+            logger.info(f"Loaded {_projection.dim}-dim vector projection from {path}")
+        return _projection
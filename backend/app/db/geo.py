@@ -0,0 +1,149 @@
+import math
+import numpy as np
+from app.core.config import settings
+
+# Geohash of (latitude, longitude) at GEO_CELL_PRECISION, BTREE-indexed; see geo_filter
+GEO_CELL_COLUMN = "geo_cell"
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = EARTH_RADIUS_KM * math.pi / 180
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def encode_geohash(latitude: float, longitude: float, precision: int) -> str:
+    """Standard geohash: interleaved longitude/latitude bisection bits, 5 per base32 character."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        if coord >= mid:
+            value = value * 2 + 1
+            interval[0] = mid
+        else:
+            value = value * 2
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+def geo_cell(latitude: float | None, longitude: float | None) -> str | None:
+    """The cell stored for a listing; None without coordinates."""
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude, settings.GEO_CELL_PRECISION)
+
+def _cell_size(precision: int) -> tuple[float, float]:
+    """(height, width) of a geohash cell in degrees. Longitude gets the extra bit of odd lengths."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+def _geohash_value(cell: str) -> int:
+    value = 0
+    for char in cell:
+        value = value * 32 + _BASE32.index(char)
+    return value
+
+def bounding_box(latitude: float, longitude: float,
+                 radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(latitude))
+    # Near the poles the circle spans every longitude
+    dlon = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return (
+        max(latitude - dlat, -90.0), min(latitude + dlat, 90.0),
+        max(longitude - dlon, -180.0), min(longitude + dlon, 180.0),
+    )
+
+def covering_cells(min_lat: float, max_lat: float, min_lon: float, max_lon: float,
+                   max_cells: int | None = None) -> list[str] | None:
+    """
+    Sorted geohash cells (at GEO_CELL_PRECISION) covering the box, or None when that takes
+    more than `max_cells` (default GEO_MAX_CELLS) of them.
+    """
+    max_cells = max_cells or settings.GEO_MAX_CELLS
+    precision = settings.GEO_CELL_PRECISION
+    height, width = _cell_size(precision)
+    first_row, last_row = math.floor((min_lat + 90) / height), math.floor((max_lat + 90) / height)
+    first_col, last_col = math.floor((min_lon + 180) / width), math.floor((max_lon + 180) / width)
+    if max(last_row - first_row + 1, 0) * max(last_col - first_col + 1, 0) > max_cells:
+        return None
+    cells = {
+        # Cell centers, clamped so the +-90 / +-180 edges stay inside the last cell
+        encode_geohash(min((row + 0.5) * height - 90, 90.0 - height / 2),
+                       min((col + 0.5) * width - 180, 180.0 - width / 2), precision)
+        for row in range(first_row, last_row + 1)
+        for col in range(first_col, last_col + 1)
+    }
+    return sorted(cells)
+
+def cell_ranges_filter(cells: list[str]) -> str:
+    """
+    SQL matching every stored cell in `cells` as string ranges the BTREE index on geo_cell
+    can serve. Cells adjacent in geohash (Z-)order are merged into one range.
+    """
+    runs: list[list[str]] = []
+    for cell in cells:
+        if runs and _geohash_value(cell) == _geohash_value(runs[-1][1]) + 1:
+            runs[-1][1] = cell
+        else:
+            runs.append([cell, cell])
+    if not runs:
+        return "false"  # empty box
+    # '~' sorts after every base32 character, so "<cell>~" bounds the run's last cell
+    clauses = [
+        f"({GEO_CELL_COLUMN} >= '{first}' AND {GEO_CELL_COLUMN} < '{last}~')"
+        for first, last in runs
+    ]
+    return "(" + " OR ".join(clauses) + ")"
+
+def _offset_sql(column: str, value: float) -> str:
+    return f"({column} - {value:.6f})" if value >= 0 else f"({column} + {-value:.6f})"
+
+def distance_sql(latitude: float, longitude: float) -> str:
+    """
+    Squared distance in km^2 from (latitude, longitude) to each row, as a LanceDB SQL
+    expression. Equirectangular (flat) approximation: no trigonometry per row, and within
+    0.1% of the great-circle distance for radii up to ~10 km away from the poles.
+    """
+    lat_scale = KM_PER_DEGREE_LAT ** 2
+    lon_scale = (KM_PER_DEGREE_LAT * math.cos(math.radians(latitude))) ** 2
+    dlat, dlon = _offset_sql("latitude", latitude), _offset_sql("longitude", longitude)
+    return f"{dlat} * {dlat} * {lat_scale:.6f} + {dlon} * {dlon} * {lon_scale:.6f}"
+
+def haversine_km(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points (NaN where unknown)."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon2 = np.radians(np.asarray(longitudes, dtype=np.float64))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def geo_filter(min_lat: float, max_lat: float, min_lon: float, max_lon: float,
+               center: tuple[float, float] | None = None, radius_km: float | None = None) -> str:
+    """
+    Filter clause for listings inside the box (and, with `center` and `radius_km`, the circle).
+    The cell ranges are answered by the geo_cell index, so only rows in nearby cells are ever
+    read; the distance and any box edge the circle doesn't already imply are then checked on
+    those rows alone, before any vector distance is computed. Areas needing more than
+    GEO_MAX_CELLS cells hold too large a share of the listings for the index to pay off, so
+    they get the distance/edge checks alone (a plain scan).
+    """
+    cells = covering_cells(min_lat, max_lat, min_lon, max_lon)
+    clauses = [cell_ranges_filter(cells)] if cells is not None else []
+    implied = (None,) * 4
+    if center is not None and radius_km is not None:
+        clauses.append(f"{distance_sql(*center)} <= {radius_km ** 2:.6f}")
+        implied = bounding_box(*center, radius_km)
+    for (column, op), bound, circle_bound in zip(
+        [("latitude", ">="), ("latitude", "<="), ("longitude", ">="), ("longitude", "<=")],
+        (min_lat, max_lat, min_lon, max_lon), implied,
+    ):
+        if bound != circle_bound:
+            clauses.append(f"{column} {op} {bound:.6f}")
+    return " AND ".join(clauses)
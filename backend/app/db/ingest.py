@@ -0,0 +1,290 @@
+import hashlib
+import json
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Iterable, Iterator
+import numpy as np
+import pyarrow as pa
+from app.core.config import settings
+from app.db.client import LanceDBClient, quote_literal
+from app.db.compact import COMPACT_COLUMN, VectorProjection, projection_path
+from app.db.geo import geo_cell
+from app.db.schemas import Listing
+from app.services.embeddings import EmbeddingService
+import structlog
+
+logger = structlog.get_logger()
+
+# Fields that are bookkeeping (or derived from other fields) rather than listing content;
+# excluded from row_hash
+UNHASHED_FIELDS = {
+    "created_at", "last_embedded_at", "is_active", "vector", "content_hash", "row_hash", "geo_cell",
+}
+
+def content_hash(text: str) -> str:
+    """Hash of the text that gets embedded (model-specific: a model change re-embeds everything)."""
+    return hashlib.sha256(f"{EmbeddingService.MODEL_NAME}\n{text}".encode("utf-8")).hexdigest()
+
+def row_hash(fields: dict) -> str:
+    content = {k: v for k, v in fields.items() if k not in UNHASHED_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+def iter_chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+@dataclass
+class IngestStats:
+    seen: int = 0
+    inserted: int = 0
+    updated: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    skipped: int = 0
+
+class ListingIngestor:
+    """
+    Incremental upsert of listings from a source (e.g. a CSV export).
+
+    Items are (text_to_embed, listing_fields) pairs. For each listing:
+    - both hashes match the stored row and it is active -> nothing is written
+    - only non-embedded fields changed (price, amenities...) -> row updated, stored vector reused
+    - embedded text changed or new listing -> re-embedded
+    Writes use merge_insert on `id`, so every write is an atomic new table version and the
+    live table stays readable. Previously active listings from the same `source` that the
+    source no longer contains are marked is_active = false (search only returns active rows).
+
+    full_rebuild=True re-embeds everything and overwrites the table instead
+    (e.g. after a schema change). With VECTOR_COMPACT_DIM set, a full rebuild also fits
+    the compact-vector projection (app/db/compact.py) on the first VECTOR_COMPACT_FIT_SAMPLE
+    rows and stores projected vectors alongside the full ones; incremental runs keep
+    projecting with the saved fit for as long as the table has the compact column.
+    """
+
+    DEACTIVATE_BATCH = 500
+
+    def __init__(self, client: LanceDBClient, embedder: EmbeddingService, source: str,
+                 chunk_size: int = 256, full_rebuild: bool = False):
+        self.client = client
+        self.embedder = embedder
+        self.source = source
+        self.chunk_size = chunk_size
+        self.full_rebuild = full_rebuild
+        self.projection: VectorProjection | None = None
+        # Full rebuild: rows are held back until there are enough to fit the projection
+        self._fit_pending = bool(full_rebuild and settings.VECTOR_COMPACT_DIM)
+
+    def ingest(self, items: Iterable[tuple[str, dict]]) -> IngestStats:
+        stats = IngestStats()
+        started = time.perf_counter()
+        if self.full_rebuild:
+            existing = {}
+        else:
+            self.client.ensure_schema()
+            existing = self._load_existing()
+            logger.info(f"Incremental ingest against {len(existing)} existing listings")
+            if self.client.compact_dim() is not None:
+                self.projection = self.client.get_compact_projection()
+                if self.projection is None:
+                    raise RuntimeError(
+                        f"No projection for '{COMPACT_COLUMN}' at {projection_path()}; "
+                        "re-run with a full rebuild"
+                    )
+
+        seen: set[str] = set()
+        table = None if self.full_rebuild else self.client.get_table()
+        # Until the projection is fitted, rows are held without their vectors, which are kept
+        # as float32 arrays instead (a Python list per 1024-dim vector takes ~8x the memory)
+        held: list[dict] = []
+        held_vectors: list[np.ndarray] = []
+        for chunk in iter_chunks(self._dedupe(items, seen, stats), self.chunk_size):
+            rows = self._build_rows(chunk, existing, stats)
+            if not rows:
+                continue
+            if self._fit_pending:
+                vectors = np.array([row.pop("vector") for row in rows], dtype=np.float32)
+                held_vectors.append(vectors)
+                held.extend(rows)
+                if len(held) < settings.VECTOR_COMPACT_FIT_SAMPLE:
+                    continue
+                table = self._write_held(table, held, held_vectors)
+                held, held_vectors = [], []
+            else:
+                table = self._write(table, rows)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Processed {stats.seen} listings ({stats.seen / elapsed:.1f}/sec): "
+                f"{stats.inserted} new, {stats.updated} updated, {stats.embedded} embedded, "
+                f"{stats.unchanged} unchanged"
+            )
+        if held:
+            # Fewer rows than the fit sample in total
+            table = self._write_held(table, held, held_vectors)
+
+        if not self.full_rebuild:
+            stats.deactivated = self._deactivate_missing(existing, seen)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Ingest finished in {elapsed:.1f}s: {asdict(stats)}")
+        if self.full_rebuild:
+            if table is not None:
+                self.client.build_indexes()
+        elif stats.inserted or stats.updated or stats.deactivated:
+            # Extend the existing indexes rather than rebuilding them
+            self.client.update_indexes()
+        return stats
+
+    def _write(self, table, rows: list[dict]):
+        if self.projection is not None:
+            compact = self.projection.transform([row["vector"] for row in rows])
+            for row, vector in zip(rows, compact.tolist()):
+                row[COMPACT_COLUMN] = vector
+        if table is None:
+            # Full rebuild: the first chunk replaces the table (new schema, no stale indexes)
+            compact_dim = self.projection.dim if self.projection is not None else None
+            table = self.client.recreate_table(rows, compact_dim)
+            if self.projection is not None:
+                # Saved only now, so searches never pair the new fit with the old table for long
+                self.projection.save(projection_path())
+            return table
+
+        # Typed by the table's own schema rather than inferred from the rows: nullability must
+        # match for merge_insert, and a chunk without e.g. coordinates would infer null columns.
+        # It also puts the columns in the table's order. A table that gained columns later (see
+        # ensure_schema) has them last, unlike Listing; merging a differently ordered source
+        # leaves the FTS index pointing at rows that the next compaction moves away.
+        data = pa.Table.from_pylist(rows, schema=table.schema)
+        if self.full_rebuild:
+            table.add(data)
+        else:
+            merge = table.merge_insert("id").when_matched_update_all().when_not_matched_insert_all()
+            merge.execute(data)
+        return table
+
+    def _write_held(self, table, rows: list[dict], vector_chunks: list[np.ndarray]):
+        """Fit the projection on the held vectors, then write the held rows chunk by chunk."""
+        sample = np.concatenate(vector_chunks)
+        self._fit_projection(sample)
+        for start in range(0, len(rows), self.chunk_size):
+            end = start + self.chunk_size
+            # Copies, so the Python vectors are freed with each batch rather than kept on `rows`
+            batch = [
+                {**row, "vector": vector}
+                for row, vector in zip(rows[start:end], sample[start:end].tolist())
+            ]
+            table = self._write(table, batch)
+        return table
+
+    def _fit_projection(self, vectors: np.ndarray) -> None:
+        self._fit_pending = False
+        dim = settings.VECTOR_COMPACT_DIM
+        if len(vectors) < dim:
+            logger.info(
+                f"Only {len(vectors)} rows; too few to fit a {dim}-dim projection, "
+                "skipping compact vectors"
+            )
+            return
+        self.projection = VectorProjection.fit(vectors, dim)
+
+    def _load_existing(self) -> dict[str, dict]:
+        """id -> stored hashes / status. Only small columns are read (no vectors)."""
+        columns = ["id", "content_hash", "row_hash", "is_active", "source"]
+        data = self.client.get_table().search().select(columns).limit(None).to_arrow().to_pydict()
+        return {
+            row_id: {"content_hash": ch, "row_hash": rh, "is_active": active, "source": source}
+            for row_id, ch, rh, active, source in zip(*(data[c] for c in columns))
+        }
+
+    def _dedupe(self, items, seen: set[str], stats: IngestStats) -> Iterator[tuple[str, dict]]:
+        for text, fields in items:
+            if fields["id"] in seen:
+                stats.skipped += 1
+                continue
+            seen.add(fields["id"])
+            stats.seen += 1
+            yield text, fields
+
+    def _build_rows(self, chunk, existing: dict[str, dict], stats: IngestStats) -> list[dict]:
+        pending = []
+        for text, fields in chunk:
+            fields = {**fields, "source": self.source}
+            hashes = {"content_hash": content_hash(text), "row_hash": row_hash(fields)}
+            prev = existing.get(fields["id"])
+            if prev and prev["is_active"] and all(prev[k] == v for k, v in hashes.items()):
+                stats.unchanged += 1
+                continue
+            pending.append((text, fields, hashes, prev))
+        if not pending:
+            return []
+
+        # Stored vector + created_at for rows that already exist (created_at must survive updates)
+        stored = self._fetch_stored([fields["id"] for _, fields, _, prev in pending if prev])
+        to_embed = [
+            i for i, (_, fields, hashes, prev) in enumerate(pending)
+            if not prev or prev["content_hash"] != hashes["content_hash"]
+            or fields["id"] not in stored
+        ]
+        # Passages (is_query=False), one batched encode() for the chunk
+        texts = [pending[i][0] for i in to_embed]
+        vectors = dict(zip(to_embed, self.embedder.get_embeddings(texts, is_query=False)))
+        now = datetime.now()
+
+        rows = []
+        for i, (_, fields, hashes, prev) in enumerate(pending):
+            old = stored.get(fields["id"])
+            values = {**fields, **hashes, "is_active": True}
+            values["geo_cell"] = geo_cell(fields.get("latitude"), fields.get("longitude"))
+            if i in vectors:
+                values.update(vector=vectors[i], last_embedded_at=now)
+            else:
+                values.update(vector=old["vector"], last_embedded_at=old["last_embedded_at"])
+            if old is not None:
+                values["created_at"] = old["created_at"]
+            try:
+                rows.append(Listing(**values).model_dump())
+            except Exception as e:
+                logger.warning(f"Skipping row {fields.get('id')}: {e}")
+                stats.skipped += 1
+                continue
+            if i in vectors:
+                stats.embedded += 1
+            if prev:
+                stats.updated += 1
+            else:
+                stats.inserted += 1
+        return rows
+
+    def _fetch_stored(self, ids: list[str]) -> dict[str, dict]:
+        if not ids:
+            return {}
+        in_list = ", ".join(quote_literal(i) for i in ids)
+        rows = (
+            self.client.get_table().search()
+            .where(f"id IN ({in_list})")
+            .select(["id", "vector", "created_at", "last_embedded_at"])
+            .limit(len(ids))
+            .to_list()
+        )
+        return {r["id"]: r for r in rows}
+
+    def _deactivate_missing(self, existing: dict[str, dict], seen: set[str]) -> int:
+        gone = [
+            row_id for row_id, prev in existing.items()
+            if prev["is_active"] and prev["source"] == self.source and row_id not in seen
+        ]
+        table = self.client.get_table()
+        for batch in iter_chunks(gone, self.DEACTIVATE_BATCH):
+            in_list = ", ".join(quote_literal(i) for i in batch)
+            table.update(where=f"id IN ({in_list})", values={"is_active": False})
+        if gone:
+            logger.info(f"Marked {len(gone)} vanished listings inactive")
+        return len(gone)
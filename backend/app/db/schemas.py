@@ -14,6 +14,11 @@ class Listing(BaseModel):
     city: str
     neighborhood: str
     description: str
+
+    # Location: WGS84 coordinates, and their geohash cell (app/db/geo.py) for radius/box filters
+    latitude: float | None = None
+    longitude: float | None = None
+    geo_cell: str | None = None
     
     # New Fields for Phase 2 (Airbnb Data)
     pets_allowed: bool
@@ -36,12 +41,29 @@ class Listing(BaseModel):
     source: str = "seed"
     is_active: bool = True
     last_embedded_at: datetime | None = None
+    # Incremental ingest (app/db/ingest.py): hash of the embedded text (vector is reused
+    # while it matches) and of every other ingested field (row is skipped while both match)
+    content_hash: str | None = None
+    row_hash: str | None = None
     
     # Vector for LanceDB
     vector: Vector(1024)
 
     model_config = ConfigDict(extra="ignore")
 
+# Column projections. The vector is never read back unless a caller asks for it explicitly.
+# Slim "card" used for result lists (what the UI renders) ...
+LISTING_CARD_COLUMNS = [
+    "id", "title", "price", "beds", "baths", "sqft", "city", "neighborhood",
+    "pets_allowed", "parking", "laundry", "air_conditioning", "vibe_score",
+    "images", "external_url", "created_at", "latitude", "longitude",
+]
+# ... and everything but the vector (and ingest/index bookkeeping) for a single listing's details.
+LISTING_DETAIL_COLUMNS = [
+    name for name in Listing.model_fields
+    if name not in ("vector", "content_hash", "row_hash", "geo_cell")
+]
+
 class SearchResult(BaseModel):
     listing: Listing
     distance: float | None = None
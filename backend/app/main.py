@@ -1,12 +1,37 @@
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.startup import get_startup_state, warm_up
 from app.api.routes import router
+from app.services.llm import LLMClient
 import structlog
 
 logger = structlog.get_logger()
 
-app = FastAPI(title="Rental Agent API")
+# Heavy ML imports (sentence_transformers/torch) are deferred to warm-up, so this stays cheap
+get_startup_state().record("import", time.perf_counter() - _import_started)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state = get_startup_state()
+    warmup_task = None
+    if settings.STARTUP_WARMUP:
+        # In the background: the server accepts connections (and /health) while warming up
+        warmup_task = asyncio.create_task(warm_up())
+    else:
+        state.ready = True
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await LLMClient.close()
+
+app = FastAPI(title="Rental Agent API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +47,12 @@ app.include_router(router)
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the model, table and warm-up queries are done."""
+    state = get_startup_state()
+    return JSONResponse(state.status(), status_code=200 if state.ready else 503)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
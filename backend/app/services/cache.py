@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable
+
+import structlog
+
+logger = structlog.get_logger()
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+class DiskVectorCache:
+    """
+    SQLite-backed key -> float32 vector store.
+    Used as a second tier behind LRUCache so the warm set survives restarts.
+    Bounded to `max_rows` least recently used vectors: pruning runs once every
+    max_rows / 10 writes, so the table can briefly hold up to ~10% more.
+    Every call is blocking I/O; async callers run them in an executor.
+    """
+
+    def __init__(self, path: str, max_rows: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_rows = max_rows
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # A cache: losing the last writes on power failure is fine, an fsync per hit is not
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors "
+            "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0)"
+        )
+        # Files written before the size bound have no last_used; they start out least recent
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(vectors)")}
+        if "last_used" not in columns:
+            self._conn.execute("ALTER TABLE vectors ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS vectors_last_used ON vectors (last_used)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._lock:
+            self._prune()
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM vectors WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE vectors SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+                self._conn.commit()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array("f", row[0]).tolist()
+
+    def put(self, key: str, vector: list[float]) -> None:
+        blob = array("f", vector).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO vectors (key, vector, last_used) VALUES (?, ?, ?)",
+                (key, blob, time.time())
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= max(1, self.max_rows // 10):
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        """Drop all but the `max_rows` most recently used vectors. Caller holds the lock."""
+        self._writes_since_prune = 0
+        cursor = self._conn.execute(
+            "DELETE FROM vectors WHERE key NOT IN "
+            "(SELECT key FROM vectors ORDER BY last_used DESC LIMIT ?)",
+            (self.max_rows,)
+        )
+        self._conn.commit()
+        if cursor.rowcount > 0:
+            self.evictions += cursor.rowcount
+            logger.info(f"Pruned {cursor.rowcount} vectors from the disk cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()
+        return {
+            "size": size,
+            "max_rows": self.max_rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.services.embeddings import get_embedding_service
+from app.core.metrics import timed
+import structlog
+
+logger = structlog.get_logger()
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for EmbeddingService.
+
+    Requests arriving within EMBEDDING_BATCH_WINDOW_MS of each other are merged into
+    a single encode() call (up to EMBEDDING_MAX_BATCH texts) on one dedicated thread,
+    instead of each request running its own encode() in the default executor and
+    competing for the GIL and torch threads. The request queue is bounded
+    (EMBEDDING_QUEUE_SIZE), so callers see backpressure instead of unbounded growth.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.window = settings.EMBEDDING_BATCH_WINDOW_MS / 1000
+        self.max_batch = settings.EMBEDDING_MAX_BATCH
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.batches = 0
+        self.items = 0
+
+    async def embed(self, text: str, is_query: bool = True) -> list[float]:
+        is_query = bool(is_query)
+        service = get_embedding_service()
+        # Cache hits don't need to wait for a batch window
+        cached = service.get_cached_embedding(text, is_query, disk=False)
+        if cached is None and service.has_disk_cache:
+            # SQLite read: off the event loop (the encode itself runs on the batch thread)
+            cached = await asyncio.get_running_loop().run_in_executor(
+                None, service.get_disk_cached_embedding, text, is_query
+            )
+        if cached is not None:
+            return cached
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+        # Queueing + batch window + encode, as seen by the caller
+        with timed("embedding_batch_wait"):
+            await self._queue.put((text, is_query, future))
+            return await future
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=settings.EMBEDDING_QUEUE_SIZE)
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._process(batch)
+
+    async def _process(self, batch):
+        service = get_embedding_service()
+        for is_query in (True, False):
+            items = [item for item in batch if item[1] is is_query]
+            if not items:
+                continue
+            texts = [text for text, _, _ in items]
+            try:
+                vectors = await self._loop.run_in_executor(
+                    self._executor, service.encode_and_cache, texts, is_query
+                )
+            except Exception as e:
+                logger.error(f"Embedding batch failed: {e}")
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, _, future), vector in zip(items, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+def get_embedding_batcher():
+    return EmbeddingBatcher.get_instance()
@@ -1,4 +1,7 @@
-from sentence_transformers import SentenceTransformer
+import time
+from app.core.config import settings
+from app.services.cache import LRUCache, DiskVectorCache
+from app.core.metrics import timed
 import structlog
 
 logger = structlog.get_logger()
@@ -6,8 +9,10 @@ logger = structlog.get_logger()
 class EmbeddingService:
     _instance = None
     _model = None
-    
+
     MODEL_NAME = "intfloat/e5-large-v2"
+    BATCH_SIZE = 32
+    BACKENDS = ("torch", "torch-int8", "onnx")
 
     @classmethod
     def get_instance(cls):
@@ -15,15 +20,172 @@ class EmbeddingService:
             cls._instance = cls()
         return cls._instance
 
-    def __init__(self):
-        logger.info(f"Loading embedding model: {self.MODEL_NAME}")
-        self._model = SentenceTransformer(self.MODEL_NAME)
+    def __init__(self, backend: str | None = None):
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unknown embedding backend '{self.backend}', expected one of {self.BACKENDS}"
+            )
+
+        if settings.EMBEDDING_TORCH_THREADS:
+            import torch
+            torch.set_num_threads(settings.EMBEDDING_TORCH_THREADS)
+
+        model_path = settings.EMBEDDING_MODEL_PATH or self.MODEL_NAME
+        logger.info(f"Loading embedding model: {model_path} (backend={self.backend})")
+        self._model = self._load_model(model_path)
         logger.info("Embedding model loaded")
 
-    def get_embedding(self, text: str, is_query: bool = False) -> list[float]:
+        # Backends produce slightly different vectors, so they must not share cache entries
+        self.model_id = self.MODEL_NAME
+        if self.backend != "torch":
+            self.model_id += f"@{self.backend}"
+        if self.backend == "onnx" and settings.EMBEDDING_ONNX_FILE:
+            self.model_id += f":{settings.EMBEDDING_ONNX_FILE}"
+
+        # Query embeddings are cached; passages are only embedded at ingest time.
+        self._query_cache = LRUCache(settings.EMBEDDING_CACHE_SIZE)
+        self._disk_cache = None
+        if settings.EMBEDDING_CACHE_PATH:
+            self._disk_cache = DiskVectorCache(
+                settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_CACHE_MAX_ROWS
+            )
+
+    def _load_model(self, model_path: str):
+        # Imported here: sentence_transformers pulls in torch, which would otherwise be
+        # paid by every process that merely imports the app
+        started = time.perf_counter()
+        from sentence_transformers import SentenceTransformer
+        logger.info(f"Imported sentence_transformers in {time.perf_counter() - started:.2f}s")
+
+        if self.backend == "onnx":
+            model_kwargs = None
+            if settings.EMBEDDING_ONNX_FILE:
+                model_kwargs = {"file_name": settings.EMBEDDING_ONNX_FILE}
+            try:
+                return SentenceTransformer(model_path, backend="onnx", model_kwargs=model_kwargs)
+            except ImportError as e:
+                raise RuntimeError(
+                    "The onnx embedding backend needs ONNX Runtime: "
+                    "pip install 'sentence-transformers[onnx]'"
+                ) from e
+
+        if self.backend == "torch-int8":
+            import torch
+            # Dynamic quantization: int8 weights for every Linear layer, activations
+            # quantized on the fly. CPU only.
+            model = SentenceTransformer(model_path, device="cpu")
+            return torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+
+        return SentenceTransformer(model_path)
+
+    @staticmethod
+    def _prefix(is_query: bool) -> str:
         # E5 models require specific prefixes
-        prefix = "query: " if is_query else "passage: "
-        return self._model.encode(prefix + text).tolist()
+        return "query: " if is_query else "passage: "
+
+    def _cache_key(self, text: str, is_query: bool) -> str:
+        normalized = " ".join(text.split()).lower()
+        return f"{self.model_id}|{self._prefix(is_query)}{normalized}"
+
+    def _cache_get(self, key: str) -> list[float] | None:
+        vector = self._query_cache.get(key)
+        if vector is None:
+            vector = self._disk_get(key)
+        return vector
+
+    def _disk_get(self, key: str) -> list[float] | None:
+        if self._disk_cache is None:
+            return None
+        vector = self._disk_cache.get(key)
+        if vector is not None:
+            self._query_cache.put(key, vector)
+        return vector
+
+    def _cache_put(self, key: str, vector: list[float]) -> None:
+        self._query_cache.put(key, vector)
+        if self._disk_cache is not None:
+            self._disk_cache.put(key, vector)
+
+    @property
+    def has_disk_cache(self) -> bool:
+        return self._disk_cache is not None
+
+    def get_cached_embedding(self, text: str, is_query: bool = True,
+                             disk: bool = True) -> list[float] | None:
+        """
+        Cache-only lookup (no encode). Only query embeddings are cached.
+        disk=False checks the in-memory tier alone, which never blocks on I/O.
+        """
+        if not is_query:
+            return None
+        key = self._cache_key(text, is_query)
+        return self._cache_get(key) if disk else self._query_cache.get(key)
+
+    def get_disk_cached_embedding(self, text: str, is_query: bool = True) -> list[float] | None:
+        """The SQLite tier alone (blocking); hits are promoted to the in-memory tier."""
+        if not is_query:
+            return None
+        return self._disk_get(self._cache_key(text, is_query))
+
+    def cache_stats(self) -> dict:
+        stats = {"memory": self._query_cache.stats()}
+        if self._disk_cache is not None:
+            stats["disk"] = self._disk_cache.stats()
+        return stats
+
+    def get_embedding(self, text: str, is_query: bool = False) -> list[float]:
+        if not is_query:
+            return self._model.encode(self._prefix(is_query) + text).tolist()
+
+        key = self._cache_key(text, is_query)
+        vector = self._cache_get(key)
+        if vector is None:
+            vector = self._model.encode(self._prefix(is_query) + text).tolist()
+            self._cache_put(key, vector)
+        return vector
+
+    def get_embeddings(self, texts: list[str], is_query: bool = False,
+                       batch_size: int | None = None) -> list[list[float]]:
+        """
+        Embed many texts with a single batched encode() call.
+        Much faster than calling get_embedding in a loop (one forward pass per batch).
+        """
+        if not texts:
+            return []
+        if not is_query:
+            return self._encode(texts, is_query, batch_size)
+
+        keys = [self._cache_key(t, is_query) for t in texts]
+        vectors = [self._cache_get(k) for k in keys]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            encoded = self._encode([texts[i] for i in missing], is_query, batch_size)
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+                self._cache_put(keys[i], vector)
+        return vectors
+
+    def encode_and_cache(self, texts: list[str], is_query: bool = False) -> list[list[float]]:
+        """Batch-encode texts the caller already looked up in the cache, caching query results."""
+        vectors = self._encode(texts, is_query)
+        if is_query:
+            for text, vector in zip(texts, vectors):
+                self._cache_put(self._cache_key(text, is_query), vector)
+        return vectors
+
+    def _encode(self, texts: list[str], is_query: bool,
+                batch_size: int | None = None) -> list[list[float]]:
+        prefix = self._prefix(is_query)
+        with timed("embedding_encode"):
+            vectors = self._model.encode(
+                [prefix + t for t in texts],
+                batch_size=batch_size or self.BATCH_SIZE,
+                show_progress_bar=False,
+            )
+        return vectors.tolist()
 
 def get_embedding_service():
     return EmbeddingService.get_instance()
@@ -0,0 +1,47 @@
+import httpx
+import structlog
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+class LLMClient:
+    """
+    Process-wide AsyncOpenAI client. One pooled HTTP client is shared by every
+    connection, so keep-alive connections (and their TLS sessions) are reused.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> AsyncOpenAI:
+        if cls._instance is None:
+            cls._instance = cls._create()
+        return cls._instance
+
+    @staticmethod
+    def _create() -> AsyncOpenAI:
+        limits = httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+        )
+        logger.info(
+            "Creating shared LLM client",
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+        )
+        return AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=settings.LLM_TIMEOUT,
+            http_client=DefaultAsyncHttpxClient(limits=limits, timeout=settings.LLM_TIMEOUT),
+        )
+
+    @classmethod
+    async def close(cls):
+        if cls._instance is not None:
+            await cls._instance.close()
+            cls._instance = None
+
+def get_llm_client() -> AsyncOpenAI:
+    return LLMClient.get_instance()
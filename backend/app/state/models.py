@@ -1,5 +1,5 @@
 from typing import List, Optional, Any, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 import uuid
 
@@ -18,3 +18,6 @@ class RentalSession(BaseModel):
     
     # Context
     user_preferences: Dict[str, Any] = Field(default_factory=dict)
+    
+    # Incrementally built LLM context (app.agents.context); derived, never serialized
+    _context: Any = PrivateAttr(default=None)
@@ -0,0 +1,256 @@
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from app.state.models import RentalSession
+from app.core.config import settings
+import structlog
+
+logger = structlog.get_logger()
+
+def serialize_session(session: RentalSession) -> bytes:
+    """Compact form for idle/persisted sessions: zlib-compressed JSON."""
+    return zlib.compress(session.model_dump_json().encode("utf-8"))
+
+def deserialize_session(blob: bytes) -> RentalSession:
+    return RentalSession.model_validate_json(zlib.decompress(blob))
+
+class SessionStore(ABC):
+    @abstractmethod
+    def get(self, session_id: str) -> RentalSession | None:
+        pass
+
+    @abstractmethod
+    def put(self, session: RentalSession) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def stats(self) -> dict:
+        return {"sessions": len(self)}
+
+    def resident_count(self) -> int:
+        """Sessions held in process memory; cheap (no I/O), e.g. for every /metrics scrape."""
+        return len(self)
+
+@dataclass
+class _Entry:
+    session: RentalSession | None  # live object, or None once compacted
+    blob: bytes | None  # compact serialized form
+    size: int  # approximate bytes held
+    last_access: float
+
+class InMemorySessionStore(SessionStore):
+    """
+    Bounded in-process store.
+    - LRU: at most `max_entries` sessions / `max_bytes` approximate bytes.
+    - TTL: sessions untouched for `ttl` seconds are dropped.
+    - Sessions idle for `compact_after` seconds are kept only in serialized form
+      and rehydrated on the next get().
+    """
+
+    SWEEP_INTERVAL = 5.0
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, compact_after: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compact_after = compact_after
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str) -> RentalSession | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if now - entry.last_access > self.ttl:
+                self._remove(session_id)
+                self.expirations += 1
+                return None
+            if entry.session is None:
+                data = zlib.decompress(entry.blob)
+                entry.session = RentalSession.model_validate_json(data)
+                entry.blob = None
+                self._bytes += len(data) - entry.size
+                entry.size = len(data)
+            entry.last_access = now
+            self._entries.move_to_end(session_id)
+            return entry.session
+
+    def put(self, session: RentalSession, size: int | None = None) -> None:
+        now = time.monotonic()
+        session.last_updated_at = datetime.now()
+        # Approximate footprint; computed once per write (end of a turn), not per read
+        if size is None:
+            size = len(session.model_dump_json())
+        with self._lock:
+            self._remove(session.session_id)
+            self._entries[session.session_id] = _Entry(session, None, size, now)
+            self._bytes += size
+            self._enforce_bounds()
+            self._maybe_sweep(now)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._remove(session_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            compacted = sum(1 for e in self._entries.values() if e.session is None)
+            return {
+                "sessions": len(self._entries),
+                "live": len(self._entries) - compacted,
+                "compacted": compacted,
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _enforce_bounds(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            session_id, _ = next(iter(self._entries.items()))
+            self._remove(session_id)
+            self.evictions += 1
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        # Entries are in access order, so the idlest are at the front
+        for session_id, entry in list(self._entries.items()):
+            idle = now - entry.last_access
+            if idle < self.compact_after:
+                break
+            if idle > self.ttl:
+                self._remove(session_id)
+                self.expirations += 1
+            elif entry.session is not None:
+                entry.blob = serialize_session(entry.session)
+                entry.session = None
+                self._bytes += len(entry.blob) - entry.size
+                entry.size = len(entry.blob)
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Persistent store backed by a local SQLite file, fronted by a bounded
+    InMemorySessionStore for hot sessions. Writes go through to SQLite, so
+    sessions survive restarts and eviction from the hot tier.
+    """
+
+    def __init__(self, path: str, cache: InMemorySessionStore, ttl: float):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(session_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._cache = cache
+        self.ttl = ttl
+        self.purge_expired()
+
+    def get(self, session_id: str) -> RentalSession | None:
+        session = self._cache.get(session_id)
+        if session is not None:
+            return session
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        session = deserialize_session(row[0])
+        self._cache.put(session)
+        return session
+
+    def put(self, session: RentalSession) -> None:
+        session.last_updated_at = datetime.now()
+        data = session.model_dump_json()
+        blob = zlib.compress(data.encode("utf-8"))
+        self._cache.put(session, size=len(data))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session.session_id, blob, time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        self._cache.delete(session_id)
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Purged {cursor.rowcount} expired sessions")
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return count
+
+    def stats(self) -> dict:
+        return {"sessions": len(self), "cache": self._cache.stats()}
+
+    def resident_count(self) -> int:
+        # The hot tier only: len(self) is a COUNT(*) under the connection lock
+        return len(self._cache)
+
+_store: SessionStore | None = None
+
+def get_session_store() -> SessionStore:
+    global _store
+    if _store is None:
+        memory = InMemorySessionStore(
+            max_entries=settings.SESSION_MAX_ENTRIES,
+            max_bytes=settings.SESSION_MAX_BYTES,
+            ttl=settings.SESSION_TTL_SECONDS,
+            compact_after=settings.SESSION_COMPACT_AFTER_SECONDS,
+        )
+        if settings.SESSION_STORE == "sqlite":
+            _store = SQLiteSessionStore(
+                settings.SESSION_SQLITE_PATH, memory, settings.SESSION_TTL_SECONDS
+            )
+        else:
+            _store = memory
+        logger.info(f"Session store: {type(_store).__name__}")
+    return _store
@@ -1,11 +1,101 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Type
 from pydantic import BaseModel
+from app.services.cache import LRUCache
+import json
+
+def encode_json(value: Any) -> str:
+    """Compact JSON; datetimes and other non-JSON values are stringified (str())."""
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+
+def is_listing_list(value: Any) -> bool:
+    """Whether a tool result is a list of listings (dicts with an "id"), e.g. search_listings."""
+    return isinstance(value, list) and all(
+        isinstance(item, dict) and "id" in item for item in value
+    )
+
+@dataclass
+class ToolResult:
+    """
+    A tool's return value, JSON-encoded exactly once. `payload` is reused verbatim
+    for the LLM history entry (unless the tool summarizes) and inside the
+    WebSocket tool_result frame, so large search results are never re-serialized.
+    Lists of listings are encoded item by item without their `per_query_fields` (scores
+    etc.; `items`), so a delta frame (see SentListings) can pick out the listings a client
+    doesn't have yet.
+    """
+    tool_name: str
+    value: Any
+    per_query_fields: frozenset = frozenset()
+    payload: str = field(init=False)
+    items: List[str] | None = field(init=False, default=None)
+
+    def __post_init__(self):
+        if not is_listing_list(self.value):
+            self.payload = encode_json(self.value)
+            return
+        self.items, encoded = [], []
+        for item in self.value:
+            body = encode_json({k: v for k, v in item.items() if k not in self.per_query_fields})
+            extra = encode_json({k: item[k] for k in self.per_query_fields if k in item})
+            self.items.append(body)
+            # Both are objects: splice them into the full item rather than encoding it again
+            encoded.append(body if extra == "{}" else body[:-1] + "," + extra[1:])
+        self.payload = "[" + ",".join(encoded) + "]"
+
+    @property
+    def frame(self) -> str:
+        """The complete {"type": "tool_result", ...} WebSocket frame, built around the payload."""
+        tool_name = json.dumps(self.tool_name)
+        return f'{{"type":"tool_result","tool_name":{tool_name},"result":{self.payload}}}'
+
+    def extras(self) -> str:
+        """per_query_fields as columns: {field: [value per listing]}, null where absent."""
+        present = [k for k in self.per_query_fields if any(k in item for item in self.value)]
+        return encode_json({k: [item.get(k) for item in self.value] for k in present})
+
+class SentListings:
+    """
+    The listings one WebSocket client already holds, so refinements ("make it cheaper")
+    don't re-send them. Listing results go out as delta frames:
+
+        {"type": "tool_result", "tool_name": ..., "ids": [...], "listings": [...], "extras": {...}}
+
+    `ids` is the full result in order and `extras` the per-query fields (scores,
+    distance_km) as columns along `ids`; `listings` only has the listings the client
+    hasn't been sent, or whose content changed since (e.g. a new price). The client keeps
+    every listing it receives by id and rebuilds the result from `ids` + `extras`.
+    Tracking is LRU-bounded: an evicted listing is simply sent again.
+    """
+
+    def __init__(self, max_size: int):
+        self._sent = LRUCache(max_size)  # id -> hash of the listing the client holds
+        self.reused = 0
+
+    def frame(self, result: ToolResult) -> str:
+        if result.items is None:
+            return result.frame
+        ids, new = [], []
+        for item, encoded in zip(result.value, result.items):
+            digest = hash(encoded)
+            if self._sent.get(item["id"]) == digest:
+                self.reused += 1
+            else:
+                self._sent.put(item["id"], digest)
+                new.append(encoded)
+            ids.append(item["id"])
+        tool_name = json.dumps(result.tool_name)
+        return (f'{{"type":"tool_result","tool_name":{tool_name},"ids":{encode_json(ids)},'
+                f'"listings":[{",".join(new)}],"extras":{result.extras()}}}')
 
 class Tool(ABC):
     name: str = "base_tool"
     description: str = "Base tool description"
     parameters: Type[BaseModel] | None = None
+    # Result fields that depend on the call rather than the listing (scores, distances);
+    # kept out of the per-listing payloads that SentListings dedupes
+    per_query_fields: frozenset = frozenset()
 
     def to_openai_function_schema(self) -> Dict[str, Any]:
         """Convert tool to OpenAI function schema"""
@@ -1,7 +1,10 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from app.tools.base import Tool
-from app.db.client import get_lancedb_client
+from app.db.client import get_lancedb_client, quote_literal
+from app.db.schemas import LISTING_DETAIL_COLUMNS
+from app.core.metrics import timed
+import asyncio
 import structlog
 
 logger = structlog.get_logger()
@@ -21,19 +24,17 @@ class GetListingDetailsTool(Tool):
         table = client.get_table()
         
         # LanceDB query by ID
-        # exact match query
-        results = table.search()\
-            .where(f"id = '{listing_id}'")\
-            .limit(1)\
-            .to_list()
+        # exact match query (served by the BTREE index on id)
+        # Full projection minus the vector, which is never useful to the LLM
+        query = table.search()\
+            .where(f"id = {quote_literal(listing_id)}")\
+            .select(client.existing_columns(LISTING_DETAIL_COLUMNS, table))\
+            .limit(1)
+        # Blocking call; keep it off the event loop so parallel lookups overlap
+        with timed("details_db"):
+            results = await asyncio.get_running_loop().run_in_executor(None, query.to_list)
             
         if not results:
             return {"error": "Listing not found"}
             
-        listing = results[0]
-        
-        # Cleanup for LLM consumption
-        if "vector" in listing:
-            del listing["vector"]
-            
-        return listing
+        return results[0]
@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+from app.tools.base import Tool
+from app.tools.search import SearchListingsTool
+from app.tools.listings import GetListingDetailsTool
+
+class ToolRegistry:
+    """
+    Process-wide set of tools. OpenAI function schemas (model_json_schema()) are
+    computed once here instead of on every LLM call.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls([SearchListingsTool(), GetListingDetailsTool()])
+        return cls._instance
+
+    def __init__(self, tools: List[Tool]):
+        self.tools: Dict[str, Tool] = {t.name: t for t in tools}
+        self.schemas: List[Dict[str, Any]] = [t.to_openai_function_schema() for t in tools]
+
+    def get(self, name: str) -> Tool | None:
+        return self.tools.get(name)
+
+def get_tool_registry():
+    return ToolRegistry.get_instance()
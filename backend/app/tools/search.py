@@ -1,11 +1,20 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
+from lancedb.query import MultiMatchQuery
 from app.tools.base import Tool
-from app.db.client import get_lancedb_client
-from app.services.embeddings import get_embedding_service
-from app.db.schemas import SearchResult
+from app.db.client import get_lancedb_client, quote_literal
+from app.db.compact import COMPACT_COLUMN, exact_distances
+from app.db.geo import GEO_CELL_COLUMN, bounding_box, geo_filter, haversine_km
+from app.services.embedding_batcher import get_embedding_batcher
+from app.db.schemas import LISTING_CARD_COLUMNS
+from app.core.config import settings
+from app.services.cache import LRUCache
+from app.core.metrics import timed
 import concurrent.futures
 import asyncio
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import structlog
 
 logger = structlog.get_logger()
@@ -29,12 +38,131 @@ class SearchParameters(BaseModel):
     city: Optional[str] = Field(None, description="City to filter by")
     neighborhood: Optional[str] = Field(None, description="Neighborhood to filter by")
     
+    # Geo filters (listings without coordinates never match them)
+    near_latitude: Optional[float] = Field(
+        None,
+        description="Latitude of a place the listings should be close to (e.g. the user's office "
+                    "or a transit stop). Use with near_longitude; results then include distance_km"
+    )
+    near_longitude: Optional[float] = Field(None, description="Longitude of that place")
+    radius_km: Optional[float] = Field(
+        None, description="Maximum distance in km from near_latitude/near_longitude (default 2)"
+    )
+    min_latitude: Optional[float] = Field(None, description="Bounding box: southern edge")
+    max_latitude: Optional[float] = Field(None, description="Bounding box: northern edge")
+    min_longitude: Optional[float] = Field(None, description="Bounding box: western edge")
+    max_longitude: Optional[float] = Field(None, description="Bounding box: eastern edge")
+    
     sort_by: Optional[str] = Field("relevance", description="Sort order: 'relevance', 'price_asc', 'price_desc', 'newest'")
+    search_mode: Optional[str] = Field(
+        "auto",
+        description="How the query is matched: 'auto' (default), 'hybrid' (keywords + meaning), "
+                    "'semantic' (meaning only) or 'keyword' (exact terms only, e.g. a neighborhood "
+                    "name or 'penthouse')"
+    )
+
+    limit: Optional[int] = Field(
+        None, description="Maximum number of listings to return (default 50)"
+    )
+    offset: Optional[int] = Field(
+        None,
+        description="Number of listings to skip, to page through more results (e.g. 'show me more')"
+    )
+
+# sort_by -> (column, descending). Anything else is relevance / natural order.
+SORT_KEYS = {
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+    "newest": ("created_at", True),
+}
+
+# Engine score columns -> names returned to callers
+SCORE_COLUMNS = {"_distance": "distance", "_score": "text_score", "_relevance": "relevance"}
+
+# Listing types and amenities that appear literally in listings. Auto mode answers a query that
+# is just one of these, or a city/neighborhood name, with BM25 alone; anything else ("quiet",
+# "pet friendly", "nice place") is about meaning and goes hybrid.
+KEYWORD_TERMS = frozenset({
+    "penthouse", "studio", "loft", "duplex", "triplex", "townhouse", "condo", "cottage", "bungalow",
+    "victorian", "edwardian", "garage", "balcony", "patio", "deck", "garden", "backyard", "rooftop",
+    "fireplace", "pool", "gym", "doorman", "elevator", "dishwasher", "hardwood floors",
+})
+
+def is_keyword_query(query: str, place_names: frozenset[str] = frozenset()) -> bool:
+    """
+    Whether the whole query is a literal term: a place name ("Mission District") or one of
+    KEYWORD_TERMS.
+    """
+    term = " ".join(query.lower().split()).strip(" .,!?")
+    return term in KEYWORD_TERMS or term in place_names
+
+class SearchResultCache:
+    """
+    Results of identical search_listings calls (same normalized query, filters, sort, mode
+    and page), LRU-bounded. Entries belong to one table version: the whole cache is flushed
+    as soon as a newer version is seen, so upserts never serve stale listings. Identical
+    searches already in flight are coalesced onto one execution. Entries are immutable
+    Arrow tables, so callers can share them.
+    """
+
+    def __init__(self, max_size: int):
+        self._cache = LRUCache(max_size)
+        self._version = None
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.invalidations = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, version: int, key: tuple, compute) -> pa.Table:
+        if version != self._version:
+            if self._version is not None:
+                self._cache.clear()
+                self.invalidations += 1
+            self._version = version
+
+        rows = self._cache.get(key)
+        if rows is None:
+            flight_key = (version,) + key
+            task = self._inflight.get(flight_key)
+            if task is None:
+                task = asyncio.ensure_future(compute())
+                self._inflight[flight_key] = task
+                task.add_done_callback(lambda t: self._finish(flight_key, version, key, t))
+            else:
+                self.coalesced += 1
+            # Shielded: a caller going away (e.g. a closed socket) doesn't cancel it for the others
+            rows = await asyncio.shield(task)
+        return rows
+
+    def _finish(self, flight_key: tuple, version: int, key: tuple, task: asyncio.Future) -> None:
+        self._inflight.pop(flight_key, None)
+        if not task.cancelled() and task.exception() is None and version == self._version:
+            self._cache.put(key, task.result())
+
+    def clear(self) -> None:
+        """Drop every cached result, e.g. after swapping the embedding backend (not in the key)."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "table_version": self._version,
+        }
+
+_search_cache: SearchResultCache | None = None
+
+def get_search_cache() -> SearchResultCache:
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchResultCache(settings.SEARCH_CACHE_SIZE)
+    return _search_cache
 
 class SearchListingsTool(Tool):
     name = "search_listings"
     description = "Search for rentals. Supports semantic query, boolean filters, and sorting."
     parameters = SearchParameters
+    per_query_fields = frozenset(SCORE_COLUMNS.values()) | {"distance_km"}
 
     async def execute(self, query: str = None, 
                       min_price: int = None, max_price: int = None, 
@@ -44,29 +172,32 @@ class SearchListingsTool(Tool):
                       laundry: bool = None, air_conditioning: bool = None,
                       min_vibe: float = None,
                       city: str = None, neighborhood: str = None,
-                      sort_by: str = "relevance") -> List[dict]:
+                      near_latitude: float = None, near_longitude: float = None,
+                      radius_km: float = None,
+                      min_latitude: float = None, max_latitude: float = None,
+                      min_longitude: float = None, max_longitude: float = None,
+                      sort_by: str = "relevance", search_mode: str = "auto",
+                      limit: int = None, offset: int = None) -> List[dict] | dict:
                       
-        logger.info(f"Search: '{query}' filters={{price: {min_price}-{max_price}, pets: {pets_allowed}, sort: {sort_by}}}")
+        logger.info(
+            f"Search: '{query}' filters={{price: {min_price}-{max_price}, pets: {pets_allowed}, "
+            f"near: {near_latitude},{near_longitude}, sort: {sort_by}, mode: {search_mode}}}"
+        )
+        
+        limit = max(1, min(limit or settings.SEARCH_DEFAULT_LIMIT, settings.SEARCH_MAX_LIMIT))
+        offset = max(offset or 0, 0)
+        if offset > settings.SEARCH_MAX_OFFSET:
+            return {
+                "error": f"offset can be at most {settings.SEARCH_MAX_OFFSET}; "
+                         "narrow the search with filters instead of paging further"
+            }
         
         client = get_lancedb_client()
         table = client.get_table()
         
-        if query:
-            # Semantic Search
-            embedding_service = get_embedding_service()
-            loop = asyncio.get_running_loop()
-            # E5 requires query prefix
-            vector = await loop.run_in_executor(None, embedding_service.get_embedding, query, True)
-            search_builder = table.search(vector)
-        else:
-            # Pure Filter Search
-            search_builder = table.search() # No vector
-        
-        # we don't need to limit here, we will limit in the UI
-        # search_builder.limit(50)
-
         # 3. Construct Filters
-        filters = []
+        # Listings that vanished from their source are kept but deactivated (see app/db/ingest.py)
+        filters = ["is_active = true"]
         if min_price is not None: filters.append(f"price >= {min_price}")
         if max_price is not None: filters.append(f"price <= {max_price}")
         if min_beds is not None: filters.append(f"beds >= {min_beds}")
@@ -81,39 +212,364 @@ class SearchListingsTool(Tool):
         if air_conditioning: filters.append("air_conditioning = true")
         
         if min_vibe is not None: filters.append(f"vibe_score >= {min_vibe}")
-        if city: filters.append(f"city = '{city}'")
-        if neighborhood: filters.append(f"neighborhood = '{neighborhood}'")
+        if city: filters.append(f"city = {quote_literal(city)}")
+        if neighborhood: filters.append(f"neighborhood = {quote_literal(neighborhood)}")
+        
+        # Radius and/or bounding box: small areas are pruned through the geo_cell index before any
+        # vector distance (app/db/geo.py)
+        center = None
+        box = [-90.0, 90.0, -180.0, 180.0]
+        if (near_latitude is None) != (near_longitude is None):
+            return {"error": "near_latitude and near_longitude must be given together"}
+        if near_latitude is not None:
+            center = (near_latitude, near_longitude)
+            if radius_km is None:
+                radius_km = settings.SEARCH_DEFAULT_RADIUS_KM
+            elif radius_km <= 0:
+                return {"error": "radius_km must be greater than 0"}
+            box = list(bounding_box(near_latitude, near_longitude, radius_km))
+        bounds = [min_latitude, max_latitude, min_longitude, max_longitude]
+        for i, bound in enumerate(bounds):
+            if bound is not None:
+                box[i] = max(box[i], bound) if i % 2 == 0 else min(box[i], bound)
+        if center is not None or any(bound is not None for bound in bounds):
+            geo_columns = [GEO_CELL_COLUMN, "latitude", "longitude"]
+            if client.existing_columns(geo_columns, table) != geo_columns:
+                # Table built before coordinates were added and not migrated yet
+                return {
+                    "error": "Location filters are unavailable: listings have no coordinates yet"
+                }
+            filters.append(geo_filter(*box, center=center, radius_km=radius_km))
+        
+        filter_str = " AND ".join(filters)
+        logger.debug(f"Applying filters: {filter_str}")
+        
+        # filter_str is already canonical (fixed clause order, unset filters omitted)
+        key = (
+            " ".join(query.split()).lower() if query else None,
+            filter_str,
+            sort_by if sort_by in SORT_KEYS else "relevance",
+            search_mode or "auto",
+            limit,
+            offset,
+        )
+        results = await get_search_cache().get_or_compute(
+            table.version, key,
+            lambda: self._search(
+                client, table, query, filter_str, sort_by, search_mode, limit, offset, center
+            )
+        )
+        # Columnar until here; plain dicts only for the caller (the tool result encoder)
+        with timed("search_to_rows"):
+            return results.to_pylist()
+
+    async def _search(self, client, table, query: str | None, filter_str: str, sort_by: str,
+                      search_mode: str, limit: int, offset: int,
+                      center: tuple[float, float] | None = None) -> pa.Table:
+        loop = asyncio.get_running_loop()
+        timings = {}
+        has_fts = client.has_fts_index(table)
+        place_names = frozenset()
+        if query and has_fts and search_mode not in ("semantic", "keyword", "hybrid"):
+            # Read once per table version; off the event loop like every other table scan
+            place_names = await loop.run_in_executor(None, client.place_names, table)
+        mode = self._resolve_mode(query, search_mode, has_fts, place_names)
+        
+        results = None
+        if mode == "keyword" and search_mode != "keyword":
+            # Auto mode, literal term: try BM25 alone and only embed if it finds nothing
+            with timed("search_db", timings):
+                results = await loop.run_in_executor(
+                    None, self._run_auto_keyword, table, query, filter_str, sort_by, limit, offset
+                )
+            if results is None:
+                mode = "hybrid"
+        
+        if results is None:
+            vector = None
+            if mode in ("semantic", "hybrid"):
+                # Semantic Search: concurrent queries are micro-batched into one encode()
+                # E5 requires query prefix
+                with timed("search_embed", timings):
+                    vector = await get_embedding_batcher().embed(query, is_query=True)
             
-        if filters:
-            filter_str = " AND ".join(filters)
-            logger.debug(f"Applying filters: {filter_str}")
+            # LanceDB calls block; run them off the event loop so concurrent tool calls overlap
+            with timed("search_db", timings):
+                results = await loop.run_in_executor(
+                    None, self._run_search,
+                    table, query, vector, filter_str, sort_by, limit, offset, mode,
+                )
+        
+        with timed("search_postprocess", timings):
+            results = self._postprocess(results, center)
+        logger.info("Search complete", mode=mode, rows=len(results), **timings)
+        return results
+
+    @staticmethod
+    def _resolve_mode(query: str | None, search_mode: str | None, has_fts: bool,
+                      place_names: frozenset[str] = frozenset()) -> str:
+        """Pick 'filter', 'semantic', 'keyword' or 'hybrid' for this call."""
+        if not query:
+            return "filter"
+        if not has_fts:
+            # No full-text index yet (e.g. table built before FTS was added)
+            return "semantic"
+        if search_mode in ("semantic", "keyword", "hybrid"):
+            return search_mode
+        return "keyword" if is_keyword_query(query, place_names) else "hybrid"
+
+    @staticmethod
+    def _postprocess(results: pa.Table, center: tuple[float, float] | None = None) -> pa.Table:
+        names = [SCORE_COLUMNS.get(name, name) for name in results.column_names]
+        results = results.rename_columns(names)
+        if center is not None and results.num_rows:
+            distances = haversine_km(*center, results["latitude"].to_numpy(zero_copy_only=False),
+                                     results["longitude"].to_numpy(zero_copy_only=False))
+            distance_km = pa.array(np.round(distances, 2), from_pandas=True)
+            results = results.append_column("distance_km", distance_km)
+        return results
+
+    @staticmethod
+    def _text_search(table, query: str, filter_str: str | None):
+        """BM25 over every full-text indexed column."""
+        search_builder = table.search(
+            MultiMatchQuery(query, get_lancedb_client().FTS_COLUMNS), query_type="fts"
+        )
+        if filter_str:
             search_builder.where(filter_str)
+        return search_builder
+
+    @staticmethod
+    def _vector_search(table, vector, filter_str: str | None, column: str = "vector",
+                       refine_factor: int | None = None):
+        search_builder = table.search(vector, vector_column_name=column)
+        # ANN tuning; ignored when the table has no vector index (exact scan)
+        search_builder = search_builder.nprobes(settings.SEARCH_NPROBES)
+        # The compact stage is rescored on full vectors anyway (_vector_candidates)
+        refine_factor = refine_factor or settings.SEARCH_REFINE_FACTOR
+        if refine_factor and column == "vector":
+            search_builder = search_builder.refine_factor(refine_factor)
+        if filter_str:
+            search_builder.where(filter_str)
+        return search_builder
+
+    def _run_auto_keyword(self, table, query: str, filter_str: str | None, sort_by: str,
+                          limit: int, offset: int) -> pa.Table | None:
+        """BM25-only search; None when BM25 matches nothing at all (the caller then goes hybrid)."""
+        results = self._run_search(
+            table, query, None, filter_str, sort_by, limit, offset, "keyword"
+        )
+        if results.num_rows:
+            return results
+        # An empty later page just means we paged past the last keyword match
+        text_search = self._text_search(table, query, filter_str)
+        if offset and text_search.select(["id", "_score"]).limit(1).to_list():
+            return results
+        return None
+
+    def _run_search(self, table, query: str | None, vector, filter_str: str | None, sort_by: str,
+                    limit: int, offset: int, mode: str) -> pa.Table:
+        sort_key = SORT_KEYS.get(sort_by)
+        if mode == "hybrid":
+            columns = ["id"] + ([sort_key[0]] if sort_key else [])
+            candidates = self._hybrid_candidates(table, query, vector, filter_str, columns)
+            if sort_key is None:
+                return self._fetch_cards(table, candidates.slice(offset, limit))
+            column, descending = sort_key
+            return self._top_k_by_column(table, candidates, column, descending, limit, offset)
+
+        if mode == "semantic" and get_lancedb_client().get_compact_projection(table) is not None:
+            # Two-stage search (compact shortlist, exact rerank), then cards for the winners.
+            # Every page slices the same fixed-depth ranking; a shortlist as deep as each page
+            # would rerank a different candidate set per page, repeating or skipping listings.
+            if sort_key is None:
+                depth = settings.SEARCH_MAX_OFFSET + settings.SEARCH_MAX_LIMIT
+                candidates = self._vector_candidates(table, vector, filter_str, ["id"], depth)
+                return self._fetch_cards(table, candidates.slice(offset, limit))
+            column, descending = sort_key
+            candidates = self._vector_candidates(
+                table, vector, filter_str, ["id", column], settings.SEARCH_CANDIDATE_POOL
+            )
+            return self._top_k_by_column(table, candidates, column, descending, limit, offset)
+
+        if mode == "semantic" and sort_key is None:
+            # refine_factor reranks k * factor ANN candidates, so the top 10 of a k=10 query needn't
+            # be the top 10 of a k=20 one and pushing offset down would overlap pages. Instead,
+            # every page slices the same ranking: a fixed-depth shortlist (deep enough for the last
+            # allowed page and the default first page's refine), reranked exactly in one go.
+            depth = settings.SEARCH_MAX_OFFSET + settings.SEARCH_MAX_LIMIT
+            if settings.SEARCH_REFINE_FACTOR:
+                depth = max(depth, settings.SEARCH_REFINE_FACTOR * settings.SEARCH_DEFAULT_LIMIT)
+            search_builder = self._vector_search(table, vector, filter_str, refine_factor=1)
+            columns = get_lancedb_client().existing_columns(LISTING_CARD_COLUMNS, table)
+            rows = search_builder.select(columns + ["_distance"]).limit(depth).to_arrow()
+            return rows.slice(offset, limit)
+        
+        if mode == "semantic":
+            search_builder = self._vector_search(table, vector, filter_str)
+            score_columns = ["_distance"]
+        elif mode == "keyword":
+            search_builder = self._text_search(table, query, filter_str)
+            score_columns = ["_score"]
+        else:
+            # Pure Filter Search
+            search_builder = table.search() # No vector
+            if filter_str:
+                search_builder.where(filter_str)
+            score_columns = []
 
         # 4. Execute & Sort
-        # LanceDB semantics: vector search always returns sorted by distance first. 
-        # If we want exact sorting (e.g. price), we might need to post-sort or use specific LancDB API if available.
-        # For now, we fetch results and post-sort in Python if sort_by != relevance.
-        # This is acceptable for N=50.
-        
-        results = search_builder.to_list()
-        
-        # Post-processing
-        listings = []
-        for row in results:
-            if "vector" in row: del row["vector"]
-            if "_distance" in row:
-                row["distance"] = row["_distance"]
-                del row["_distance"]
-            listings.append(row)
-            
-        # Python-side Sorting
-        if sort_by == "price_asc":
-            listings.sort(key=lambda x: x["price"])
-        elif sort_by == "price_desc":
-            listings.sort(key=lambda x: x["price"], reverse=True)
-        elif sort_by == "newest":
-            # Assuming created_at is comparable string or datetime, otherwise simplistic sort
-            listings.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        # relevance is default (already sorted by vector distance)
-            
-        return listings
+        if sort_key is None:
+            if mode == "filter" and "latitude" in filter_str:
+                # A plain scan applies its limit to the indexed part of the filter before the rest
+                # (exact bounds / distance; the only unindexed columns filtered on), losing
+                # matches. Read the matching ids unbounded and page in Arrow instead.
+                ids = search_builder.select(["id"]).limit(None).to_arrow()
+                return self._fetch_cards(table, ids.slice(offset, limit))
+            if mode == "keyword":
+                # FTS applies the limit before the offset (any later page comes back empty), and
+                # tied BM25 scores come back in an order that depends on the limit. Rank one
+                # fixed-size pool instead, ties by id, and page it in Arrow like hybrid results.
+                depth = max(offset + limit, settings.SEARCH_CANDIDATE_POOL)
+                candidates = search_builder.select(["id", "_score"]).limit(depth).to_arrow()
+                order = pc.sort_indices(
+                    candidates, sort_keys=[("_score", "descending"), ("id", "ascending")]
+                )
+                return self._fetch_cards(table, candidates.take(order).slice(offset, limit))
+            # Natural order: push the page into the scan
+            columns = get_lancedb_client().existing_columns(LISTING_CARD_COLUMNS, table)
+            return search_builder.select(columns).limit(limit).offset(offset).to_arrow()
+        
+        column, descending = sort_key
+        # Ranked queries re-sort a bounded pool of best matches, filter-only ones scan all matches
+        pool = settings.SEARCH_CANDIDATE_POOL if score_columns else None
+        candidates = search_builder.select(["id", column] + score_columns).limit(pool).to_arrow()
+        return self._top_k_by_column(table, candidates, column, descending, limit, offset)
+
+    def _hybrid_candidates(self, table, query: str, vector, filter_str: str | None,
+                           columns: List[str]) -> pa.Table:
+        """
+        Fuse the vector and BM25 candidate lists with reciprocal rank fusion:
+        score(doc) = sum over lists of 1 / (SEARCH_RRF_K + rank). Best first.
+        """
+        pool = settings.SEARCH_CANDIDATE_POOL
+        vector_rows = self._vector_candidates(table, vector, filter_str, columns, pool)
+        text_rows = (
+            self._text_search(table, query, filter_str)
+            .select(columns + ["_score"]).limit(pool).to_arrow()
+        )
+        
+        def with_rrf(rows: pa.Table, first_position: int) -> pa.Table:
+            ranks = np.arange(1, rows.num_rows + 1, dtype=np.float64)
+            rows = rows.append_column("_relevance", pa.array(1.0 / (settings.SEARCH_RRF_K + ranks)))
+            # First-seen position (vector list, then BM25-only hits) breaks relevance ties
+            positions = first_position + np.arange(rows.num_rows)
+            return rows.append_column("_position", pa.array(positions))
+        
+        # Full outer join on id: a listing found by both lists gets both contributions
+        fused = with_rrf(vector_rows, 0).join(
+            with_rrf(text_rows, vector_rows.num_rows), keys="id", join_type="full outer",
+            left_suffix="", right_suffix="_text", coalesce_keys=True,
+        )
+        for column in columns[1:] + ["_position"]:
+            merged = pc.coalesce(fused[column], fused[f"{column}_text"])
+            fused = fused.set_column(fused.column_names.index(column), column, merged)
+        relevance = pc.add(
+            pc.fill_null(fused["_relevance"], 0.0), pc.fill_null(fused["_relevance_text"], 0.0)
+        )
+        fused = fused.set_column(fused.column_names.index("_relevance"), "_relevance", relevance)
+        order = pc.sort_indices(
+            fused, sort_keys=[("_relevance", "descending"), ("_position", "ascending")]
+        )
+        return fused.select(columns + ["_distance", "_score", "_relevance"]).take(order)
+
+    def _vector_candidates(self, table, vector, filter_str: str | None, columns: List[str],
+                           limit: int) -> pa.Table:
+        """
+        The `limit` nearest rows (columns + _distance), best first. With compact vectors, the
+        ANN stage runs over the PCA-reduced column for max(limit, VECTOR_COMPACT_RERANK)
+        candidates, whose full vectors are then fetched and rescored exactly.
+        """
+        projection = get_lancedb_client().get_compact_projection(table)
+        if projection is None:
+            return (
+                self._vector_search(table, vector, filter_str)
+                .select(columns + ["_distance"]).limit(limit).to_arrow()
+            )
+        
+        shortlist = (
+            self._vector_search(table, projection.transform(vector), filter_str, COMPACT_COLUMN)
+            .select(["id", "_distance"])
+            .with_row_id(True)
+            .limit(max(limit, settings.VECTOR_COMPACT_RERANK))
+            .to_arrow()
+        )
+        if not shortlist.num_rows:
+            fields = [table.schema.field(c) for c in columns]
+            return pa.schema(fields + [pa.field("_distance", pa.float32())]).empty_table()
+        
+        # Positional take by row id is cheaper than an id IN (...) lookup. Row ids are only
+        # valid for the version that produced them, so if the shared handle moved to a newer
+        # version in between (and rows came back different), look the ids up instead.
+        try:
+            rows = (
+                table.take_row_ids(shortlist["_rowid"].to_pylist())
+                .select(columns + ["vector"]).to_arrow()
+            )
+        except Exception as e:
+            logger.info(f"Row id take failed, looking up by id: {e}")
+            rows = None
+        if (rows is None or rows.num_rows != shortlist.num_rows
+                or not pc.all(pc.is_in(rows["id"], value_set=shortlist["id"])).as_py()):
+            ids = ", ".join(quote_literal(i) for i in shortlist["id"].to_pylist())
+            rows = (
+                table.search().where(f"id IN ({ids})")
+                .select(columns + ["vector"]).limit(shortlist.num_rows).to_arrow()
+            )
+        full = rows["vector"].combine_chunks()
+        vectors = full.flatten().to_numpy().reshape(len(full), -1)
+        query = np.asarray(vector, dtype=np.float32)
+        distances = exact_distances(vectors, query, settings.VECTOR_INDEX_METRIC)
+        rows = rows.select(columns).append_column("_distance", pa.array(distances, pa.float32()))
+        top = pc.select_k_unstable(rows, k=limit, sort_keys=[("_distance", "ascending")])
+        return rows.take(top)
+
+    def _top_k_by_column(self, table, candidates: pa.Table, column: str, descending: bool,
+                         limit: int, offset: int) -> pa.Table:
+        """
+        LanceDB can't ORDER BY, so select the top (offset + limit) rows by `column` in two stages:
+        1. The caller fetches only id + sort key (+ scores) for the candidates; keep a bounded
+           top-k of them with select_k (ties keep candidate order, i.e. relevance).
+        2. Fetch card columns for just the winning ids.
+        """
+        if not candidates.num_rows:
+            return candidates
+        candidates = candidates.append_column("_rank", pa.array(np.arange(candidates.num_rows)))
+        order = "descending" if descending else "ascending"
+        top = pc.select_k_unstable(
+            candidates, k=offset + limit, sort_keys=[(column, order), ("_rank", "ascending")]
+        )
+        return self._fetch_cards(table, candidates.take(top).slice(offset).drop_columns(["_rank"]))
+
+    @staticmethod
+    def _fetch_cards(table, candidates: pa.Table) -> pa.Table:
+        """Card columns for `candidates`, in their order, carrying over their score columns."""
+        if not candidates.num_rows:
+            return candidates
+        
+        ids = ", ".join(quote_literal(i) for i in candidates["id"].to_pylist())
+        columns = get_lancedb_client().existing_columns(LISTING_CARD_COLUMNS, table)
+        rows = (
+            table.search().where(f"id IN ({ids})")
+            .select(columns).limit(candidates.num_rows).to_arrow()
+        )
+        
+        # Position of each candidate in `rows`; null for ids that disappeared meanwhile
+        positions = pc.index_in(candidates["id"], value_set=rows["id"])
+        found = pc.is_valid(positions)
+        candidates = candidates.filter(found)
+        cards = rows.take(positions.filter(found))
+        for score_column in SCORE_COLUMNS:
+            if score_column in candidates.column_names:
+                cards = cards.append_column(score_column, candidates[score_column])
+        return cards
@@ -0,0 +1,85 @@
+"""
+Recall@k vs latency of ANN search against exact (brute-force) search.
+
+Query vectors are sampled from the stored listing vectors, so they follow the
+real embedding distribution. Usage:
+
+    python scripts/benchmark_ann.py --queries 50 --k 10 --nprobes 5 10 20 50 --refine 0 10
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from app.db.client import get_lancedb_client
+from benchmark_utils import percentile
+
+def run_queries(table, queries, k, nprobes=None, refine_factor=None, exact=False):
+    latencies = []
+    results = []
+    for vector in queries:
+        builder = (
+            table.search(vector, vector_column_name="vector").select(["id", "_distance"]).limit(k)
+        )
+        if exact:
+            builder = builder.bypass_vector_index()
+        else:
+            builder = builder.nprobes(nprobes)
+            if refine_factor:
+                builder = builder.refine_factor(refine_factor)
+        started = time.perf_counter()
+        rows = builder.to_list()
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([r["id"] for r in rows])
+    return results, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobes", type=int, nargs="+", default=[5, 10, 20, 50])
+    parser.add_argument("--refine", type=int, nargs="+", default=[0, 10])
+    parser.add_argument("--build", action="store_true",
+                        help="(Re)build the vector index before benchmarking")
+    args = parser.parse_args()
+
+    client = get_lancedb_client()
+    table = client.get_table()
+    row_count = table.count_rows()
+
+    # Explicitly `vector`: with compact vectors, the client's default ANN column is another one
+    if args.build:
+        client.create_vector_index(replace=True, column="vector")
+        table = client.get_table()
+    if not any(idx.columns == ["vector"] for idx in table.list_indices()):
+        print("No vector index on 'vector' - run with --build (and enough rows) first.")
+        return
+
+    # Only the sampled rows' vectors are read
+    offsets = sorted(random.sample(range(row_count), min(args.queries, row_count)))
+    queries = table.take_offsets(offsets).select(["vector"]).to_arrow()["vector"].to_pylist()
+    print(f"--- ANN benchmark: {row_count} rows, {len(queries)} queries, k={args.k} ---\n")
+
+    truth, exact_lat = run_queries(table, queries, args.k, exact=True)
+    print(f"{'config':<24}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    print(f"{'exact':<24}{1.0:>10.3f}{percentile(exact_lat, 50):>10.2f}"
+          f"{percentile(exact_lat, 95):>10.2f}{statistics.mean(exact_lat):>10.2f}")
+
+    for nprobes in args.nprobes:
+        for refine in args.refine:
+            found, lat = run_queries(table, queries, args.k, nprobes=nprobes, refine_factor=refine)
+            recall = statistics.mean(
+                len(set(f) & set(t)) / max(1, len(t)) for f, t in zip(found, truth)
+            )
+            label = f"nprobes={nprobes} refine={refine}"
+            print(f"{label:<24}{recall:>10.3f}{percentile(lat, 50):>10.2f}"
+                  f"{percentile(lat, 95):>10.2f}{statistics.mean(lat):>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compact vectors (PCA projection + exact rerank, app/db/compact.py) vs full-vector search:
+memory, latency and recall@k.
+
+For each --dims value a synthetic table is built once under --data-dir. Its vectors are
+concentrated near an --intrinsic-dim subspace: real sentence embeddings are strongly
+anisotropic, while the uniform random vectors of benchmark_search.py cannot be compressed
+by any projection. The projection is fitted on the first chunk, the way a full rebuild
+fits it at ingest. Both columns get the app's ANN index (when rows >= VECTOR_INDEX_MIN_ROWS).
+
+Cases, each scored against an exact brute-force scan of the full vectors:
+- full_ann        ANN over `vector` (what search does without compact vectors)
+- compact_only    ANN over the compact column, no rerank
+- compact_rerank  compact shortlist of VECTOR_COMPACT_RERANK, rescored on full vectors
+                  (the app path)
+
+    python scripts/benchmark_compact.py --rows 100000 --dims 64 128 256 --queries 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from app.core.config import settings
+from app.db.client import LanceDBClient, get_lancedb_client
+from app.db.compact import COMPACT_COLUMN, VectorProjection, projection_path
+from app.tools.search import SearchListingsTool
+from benchmark_utils import (
+    SUMMARY_HEADER, format_summary, low_rank_basis, low_rank_unit_vectors, summarize,
+    synthetic_listings,
+)
+
+FILTER = "is_active = true"
+
+def open_table(data_dir: Path, rows: int, dim: int, basis: np.ndarray, rebuild: bool):
+    """Point the app at the synthetic (rows, dim) table, building it and its projection first."""
+    settings.LANCEDB_URI = str(data_dir / f"compact_{rows}_{dim}")
+    LanceDBClient._instance = None
+    client = get_lancedb_client()
+    if rebuild or client.get_table().count_rows() != rows or not projection_path().exists():
+        print(f"Building synthetic table with {rows} rows, {dim}-dim compact vectors...")
+        started = time.perf_counter()
+        fit_rows = min(rows, settings.VECTOR_COMPACT_FIT_SAMPLE)
+        sample = low_rank_unit_vectors(np.random.default_rng(0), fit_rows, basis)
+        projection = VectorProjection.fit(sample, dim)
+        for i, chunk in enumerate(synthetic_listings(rows, basis=basis, projection=projection)):
+            if i == 0:
+                client._db.create_table(client.TABLE_NAME, chunk, mode="overwrite")
+                client.invalidate()
+            else:
+                client.get_table().add(chunk)
+        projection.save(projection_path())
+        client.build_indexes()
+        client.create_vector_index(column="vector")
+        print(f"Built in {time.perf_counter() - started:.1f}s")
+    return client.get_table()
+
+def recall(found: list[list[str]], truth: list[list[str]]) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth) if t]))
+
+def timed_runs(fn, queries):
+    results, latencies = [], []
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return results, summarize(latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--intrinsic-dim", type=int, default=96,
+                        help="Dimension of the subspace vectors concentrate near")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10, help="Recall@k")
+    parser.add_argument("--rerank", type=int, default=settings.VECTOR_COMPACT_RERANK,
+                        help="Compact shortlist size")
+    parser.add_argument("--data-dir", default="data/benchmarks",
+                        help="Where synthetic tables are kept between runs")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild synthetic tables even if present")
+    args = parser.parse_args()
+
+    settings.VECTOR_COMPACT_RERANK = args.rerank
+    basis = low_rank_basis(args.intrinsic_dim)
+    queries = low_rank_unit_vectors(np.random.default_rng(1), args.queries, basis)
+    tool = SearchListingsTool()
+
+    for dim in args.dims:
+        table = open_table(Path(args.data_dir), args.rows, dim, basis, args.rebuild)
+        projection = get_lancedb_client().get_compact_projection(table)
+
+        def ids(builder):
+            return builder.select(["id", "_distance"]).limit(args.k).to_arrow()["id"].to_pylist()
+
+        def exact(q):
+            search = table.search(q, vector_column_name="vector").bypass_vector_index()
+            return ids(search.where(FILTER))
+
+        def compact_only(q):
+            return ids(tool._vector_search(table, projection.transform(q), FILTER, COMPACT_COLUMN))
+
+        def compact_rerank(q):
+            rows = tool._vector_candidates(table, q, FILTER, ["id"], args.k)
+            return rows["id"].to_pylist()
+
+        cases = {
+            "exact": exact,
+            "full_ann": lambda q: ids(tool._vector_search(table, q, FILTER)),
+            "compact_only": compact_only,
+            "compact_rerank": compact_rerank,
+        }
+        full_mb = args.rows * 1024 * 4 / 2**20
+        compact_mb = args.rows * dim * 4 / 2**20
+        indexes = sorted(idx.name for idx in table.list_indices() if "vector" in idx.name)
+        print(f"\n--- {args.rows} rows, compact dim {dim} (intrinsic {args.intrinsic_dim}), "
+              f"k={args.k}, rerank {args.rerank} ---")
+        print(f"vector column {full_mb:.0f} MB, {COMPACT_COLUMN} {compact_mb:.0f} MB "
+              f"({1024 // dim}x smaller); indexes: {indexes}")
+        print(f"{'case':<16}{'recall':>8}{SUMMARY_HEADER}")
+
+        for fn in cases.values():
+            fn(queries[0])  # warm up
+        truth = None
+        for name, fn in cases.items():
+            found, summary = timed_runs(fn, queries)
+            truth = truth or found
+            print(f"{name:<16}{recall(found, truth):>8.3f}{format_summary(summary)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Concurrent query-embedding benchmark: per-request encode() in the default executor
+(the old search path) vs. the micro-batching EmbeddingBatcher.
+
+Every query text is unique so the embedding cache never short-circuits the encode.
+
+    python scripts/benchmark_embeddings.py --concurrency 8 32 64 --rounds 3
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from app.services.embeddings import get_embedding_service
+from app.services.embedding_batcher import get_embedding_batcher
+from benchmark_utils import percentile
+
+def unique_query():
+    return f"quiet apartment with parking {uuid.uuid4().hex[:8]}"
+
+async def timed(make_call):
+    started = time.perf_counter()
+    await make_call()
+    return (time.perf_counter() - started) * 1000
+
+async def run(label, make_call, concurrency, rounds):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        latencies += await asyncio.gather(*(timed(make_call) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    p50, p95, p99 = (percentile(latencies, q) for q in (50, 95, 99))
+    print(f"{label:<10}{concurrency:>6}{len(latencies) / elapsed:>12.1f}"
+          f"{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    service = get_embedding_service()
+    batcher = get_embedding_batcher()
+    loop = asyncio.get_running_loop()
+    service.get_embedding("warm up", is_query=True)
+
+    print(f"{'mode':<10}{'conc':>6}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for concurrency in args.concurrency:
+        await run("executor",
+                  lambda: loop.run_in_executor(None, service.get_embedding, unique_query(), True),
+                  concurrency, args.rounds)
+        await run("batcher", lambda: batcher.embed(unique_query(), is_query=True),
+                  concurrency, args.rounds)
+    print(f"\nBatcher stats: {batcher.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
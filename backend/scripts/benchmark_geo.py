@@ -0,0 +1,139 @@
+"""
+Radius search through the geo_cell index (app/db/geo.py) vs a naive distance filter.
+
+A synthetic table (coordinates spread uniformly over roughly San Francisco) is built once
+under --data-dir with the app's indexes. For each --radii value, random centers are queried:
+
+- filter_naive     the distance check alone in the SQL filter: evaluated on every row
+- filter_indexed   the app's geo filter: cell ranges served by the BTREE index, distance
+                   checked only on the rows in those cells (or, for areas of more than
+                   GEO_MAX_CELLS cells, the naive filter again; set GEO_MAX_CELLS high to
+                   time the index there too)
+- vector_naive     ANN search prefiltered by the naive distance filter
+- vector_indexed   ANN search prefiltered by the app's geo filter
+
+"match" is the fraction of queries whose indexed case returns exactly the same ids as
+the naive one, i.e. that the cells never prune a listing inside the radius.
+
+    python scripts/benchmark_geo.py --rows 100000 500000 --radii 0.5 1 2 5 --queries 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from app.core.config import settings
+from app.db.client import LanceDBClient, get_lancedb_client
+from app.db.geo import GEO_CELL_COLUMN, bounding_box, covering_cells, distance_sql, geo_filter
+from app.tools.search import SearchListingsTool
+from benchmark_utils import (
+    SF_BOUNDS, SUMMARY_HEADER, format_summary, random_unit_vectors, summarize, synthetic_listings,
+)
+
+ACTIVE = "is_active = true"
+
+def open_table(data_dir: Path, rows: int, rebuild: bool):
+    """Point the app's LanceDB client at the synthetic table for `rows`, building it if needed."""
+    settings.LANCEDB_URI = str(data_dir / f"listings_{rows}")
+    LanceDBClient._instance = None
+    client = get_lancedb_client()
+    table = client.get_table()
+    # Tables built before listings had coordinates are rebuilt too
+    if rebuild or table.count_rows() != rows or GEO_CELL_COLUMN not in table.schema.names:
+        print(f"Building synthetic table with {rows} rows...")
+        started = time.perf_counter()
+        for i, chunk in enumerate(synthetic_listings(rows)):
+            if i == 0:
+                client._db.create_table(client.TABLE_NAME, chunk, mode="overwrite")
+                client.invalidate()
+            else:
+                client.get_table().add(chunk)
+        client.build_indexes()
+        print(f"Built in {time.perf_counter() - started:.1f}s")
+    return client.get_table()
+
+def timed_runs(fn, queries):
+    results, latencies = [], []
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        results.append(fn(*query))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return results, summarize(latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--radii", type=float, nargs="+", default=[0.5, 1.0, 2.0, 5.0],
+                        help="Search radius in km")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10, help="Results per vector query")
+    parser.add_argument("--data-dir", default="data/benchmarks",
+                        help="Where synthetic tables are kept between runs")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild synthetic tables even if present")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    centers = list(zip(rng.uniform(SF_BOUNDS[0], SF_BOUNDS[1], args.queries).tolist(),
+                       rng.uniform(SF_BOUNDS[2], SF_BOUNDS[3], args.queries).tolist()))
+    vectors = random_unit_vectors(rng, args.queries)
+    tool = SearchListingsTool()
+
+    for rows in args.rows:
+        table = open_table(Path(args.data_dir), rows, args.rebuild)
+
+        def ids(query) -> frozenset:
+            return frozenset(query.select(["id"]).limit(None).to_arrow()["id"].to_pylist())
+
+        def vector_ids(vector, filter_str) -> frozenset:
+            rows = (
+                tool._vector_search(table, vector, filter_str)
+                .select(["id", "_distance"]).limit(args.k).to_arrow()
+            )
+            return frozenset(rows["id"].to_pylist())
+
+        def naive(center, radius):
+            return f"{ACTIVE} AND {distance_sql(*center)} <= {radius ** 2:.6f}"
+
+        def indexed(center, radius):
+            box = bounding_box(*center, radius)
+            return f"{ACTIVE} AND {geo_filter(*box, center=center, radius_km=radius)}"
+
+        cases = {
+            "filter_naive": lambda c, r, v: ids(table.search().where(naive(c, r))),
+            "filter_indexed": lambda c, r, v: ids(table.search().where(indexed(c, r))),
+            "vector_naive": lambda c, r, v: vector_ids(v, naive(c, r)),
+            "vector_indexed": lambda c, r, v: vector_ids(v, indexed(c, r)),
+        }
+
+        for radius in args.radii:
+            queries = [(center, radius, vector) for center, vector in zip(centers, vectors)]
+            cells = np.mean([
+                len(covering_cells(*bounding_box(*center, radius), max_cells=sys.maxsize))
+                for center in centers
+            ])
+            print(f"\n--- {rows} rows, radius {radius} km, {cells:.1f} cells/query "
+                  f"(precision <= {settings.GEO_CELL_PRECISION}) ---")
+            print(f"{'case':<16}{'matches':>9}{'match':>7}{SUMMARY_HEADER}")
+            for fn in cases.values():
+                fn(*queries[0])  # warm up
+            reference = {}
+            for name, fn in cases.items():
+                found, summary = timed_runs(fn, queries)
+                kind = name.split("_")[0]
+                truth = reference.setdefault(kind, found)
+                agree = np.mean([f == t for f, t in zip(found, truth)])
+                matches = np.mean([len(f) for f in found])
+                print(f"{name:<16}{matches:>9.1f}{agree:>7.2f}{format_summary(summary)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Search micro-benchmarks over synthetic listings tables.
+
+For each size, a synthetic table (schema-identical to Listing, random unit vectors) is
+built once under --data-dir and indexed with the app's own index settings. The search
+tool's execution path (SearchListingsTool._run_search: filters, ANN, top-k, card fetch)
+is then timed. Query embedding and the result cache are excluded; see
+benchmark_embeddings.py for the encoder.
+
+    python scripts/benchmark_search.py --rows 10000 100000 1000000 --queries 200 --concurrency 1 8
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from app.core.config import settings
+from app.db.client import LanceDBClient, get_lancedb_client
+from app.tools.search import SearchListingsTool
+from benchmark_utils import (
+    SUMMARY_HEADER, format_summary, random_unit_vectors, summarize, synthetic_listings,
+)
+
+# name -> (uses a query vector, extra filters, sort_by)
+CASES = {
+    "filter_only": (False, True, "relevance"),
+    "filter_only_sorted": (False, True, "price_asc"),
+    "vector": (True, False, "relevance"),
+    "vector_filter": (True, True, "relevance"),
+    "vector_filter_sorted": (True, True, "price_asc"),
+}
+
+def open_table(data_dir: Path, rows: int, rebuild: bool):
+    """Point the app's LanceDB client at the synthetic table for `rows`, building it if needed."""
+    settings.LANCEDB_URI = str(data_dir / f"listings_{rows}")
+    LanceDBClient._instance = None
+    client = get_lancedb_client()
+    if rebuild or client.get_table().count_rows() != rows:
+        print(f"Building synthetic table with {rows} rows...")
+        started = time.perf_counter()
+        for i, chunk in enumerate(synthetic_listings(rows)):
+            if i == 0:
+                client._db.create_table(client.TABLE_NAME, chunk, mode="overwrite")
+                client.invalidate()
+            else:
+                client.get_table().add(chunk)
+        client.build_indexes()
+        print(f"Built in {time.perf_counter() - started:.1f}s")
+    return client.get_table()
+
+def make_filter(rng: random.Random, with_filters: bool) -> str:
+    # Same clause shapes SearchListingsTool builds
+    clauses = ["is_active = true"]
+    if with_filters:
+        clauses += [
+            f"price <= {rng.randrange(2000, 6000, 100)}", f"beds >= {rng.randint(1, 3)}",
+            "pets_allowed = true",
+        ]
+    return " AND ".join(clauses)
+
+def run_case(tool, table, queries, with_vector, with_filters, sort_by, limit, concurrency):
+    def one(i):
+        filter_str, vector = queries[i]
+        started = time.perf_counter()
+        tool._run_search(table, None, vector if with_vector else None, filter_str, sort_by,
+                         limit, 0, "semantic" if with_vector else "filter")
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(len(queries))))
+    return summarize(latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=settings.SEARCH_DEFAULT_LIMIT)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--data-dir", default="data/benchmarks",
+                        help="Where synthetic tables are kept between runs")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild synthetic tables even if present")
+    args = parser.parse_args()
+
+    tool = SearchListingsTool()
+    for rows in args.rows:
+        table = open_table(Path(args.data_dir), rows, args.rebuild)
+        rng = random.Random(rows)
+        vectors = random_unit_vectors(np.random.default_rng(rows), args.queries)
+        print(f"\n--- {rows} rows, limit={args.limit}, indexes: "
+              f"{sorted(idx.name for idx in table.list_indices())} ---")
+        print(f"{'case':<22}{'conc':>5}{SUMMARY_HEADER}")
+        for name in args.cases:
+            with_vector, with_filters, sort_by = CASES[name]
+            queries = [(make_filter(rng, with_filters), v.tolist()) for v in vectors]
+            mode = "semantic" if with_vector else "filter"
+            tool._run_search(table, None, queries[0][1] if with_vector else None, queries[0][0],
+                             sort_by, args.limit, 0, mode)  # warm up
+            for concurrency in args.concurrency:
+                summary = run_case(tool, table, queries, with_vector, with_filters, sort_by,
+                                   args.limit, concurrency)
+                print(f"{name:<22}{concurrency:>5}{format_summary(summary)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Shared helpers for the benchmark scripts: latency percentiles/summaries and synthetic
+listings tables (schema-identical to `Listing`) for benchmarking at sizes we don't have
+real data for.
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from lancedb.pydantic import pydantic_to_schema
+from app.db.schemas import Listing
+from app.db.compact import COMPACT_COLUMN
+from app.db.geo import geo_cell
+
+NEIGHBORHOODS = [
+    "Mission", "SoMa", "Nob Hill", "Sunset", "Marina", "Noe Valley", "Castro", "Richmond",
+    "Haight-Ashbury", "Pacific Heights", "Bernal Heights", "Potrero Hill", "Dogpatch", "Tenderloin",
+]
+# (min_lat, max_lat, min_lon, max_lon) synthetic listings are spread over, roughly San Francisco
+SF_BOUNDS = (37.70, 37.81, -122.515, -122.36)
+TITLE_WORDS = [
+    "sunny", "quiet", "modern", "cozy", "spacious", "renovated", "penthouse", "loft", "studio",
+    "garden", "view", "victorian", "top floor", "bright", "charming", "luxury",
+]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+def summarize(latencies_ms, elapsed_s) -> dict:
+    """p50/p95/p99/mean latency (ms) and throughput (ops/sec) for one benchmark run."""
+    return {
+        "n": len(latencies_ms),
+        "p50": percentile(latencies_ms, 50),
+        "p95": percentile(latencies_ms, 95),
+        "p99": percentile(latencies_ms, 99),
+        "mean": sum(latencies_ms) / len(latencies_ms),
+        "throughput": len(latencies_ms) / elapsed_s if elapsed_s else 0.0,
+    }
+
+SUMMARY_HEADER = f"{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'ops/s':>10}"
+
+def format_summary(summary: dict) -> str:
+    return (f"{summary['n']:>7}{summary['p50']:>10.2f}{summary['p95']:>10.2f}"
+            f"{summary['p99']:>10.2f}{summary['mean']:>10.2f}{summary['throughput']:>10.1f}")
+
+def random_unit_vectors(rng: np.random.Generator, n: int, dim: int = 1024) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def low_rank_basis(intrinsic_dim: int, dim: int = 1024, seed: int = 0) -> np.ndarray:
+    """Orthonormal (intrinsic_dim, dim) basis for low_rank_unit_vectors."""
+    q, _ = np.linalg.qr(np.random.default_rng(seed).standard_normal((dim, intrinsic_dim)))
+    return q.T.astype(np.float32)
+
+def low_rank_unit_vectors(rng: np.random.Generator, n: int, basis: np.ndarray,
+                          noise: float = 0.3) -> np.ndarray:
+    """
+    Unit vectors concentrated near the span of `basis`, with a decaying spectrum (like real
+    sentence embeddings, which are far from isotropic) plus isotropic noise of relative norm
+    `noise`.
+    """
+    k, dim = basis.shape
+    scales = 1.0 / np.sqrt(np.arange(1, k + 1, dtype=np.float32))
+    vectors = (rng.standard_normal((n, k), dtype=np.float32) * scales) @ basis
+    sigma = noise * np.sqrt((scales ** 2).sum() / dim)
+    vectors += sigma * rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def synthetic_listings(n: int, chunk_size: int = 10_000, seed: int = 0,
+                       basis: np.ndarray | None = None, projection=None):
+    """
+    Yield pyarrow tables of random listings, `chunk_size` rows at a time. Vectors are uniform
+    random unit vectors, or low_rank_unit_vectors() around `basis`. With a fitted `projection`
+    (app.db.compact.VectorProjection) the compact vector column is included too.
+    """
+    schema = pydantic_to_schema(Listing)
+    dim = schema.field("vector").type.list_size
+    if projection is not None:
+        schema = schema.append(pa.field(COMPACT_COLUMN, pa.list_(pa.float32(), projection.dim)))
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        ids = [f"syn-{i}" for i in range(start, start + size)]
+        words = rng.choice(TITLE_WORDS, size=(size, 2))
+        hoods = rng.choice(NEIGHBORHOODS, size=size)
+        titles = [f"{a.capitalize()} {b} in {h}" for (a, b), h in zip(words, hoods)]
+        flags = rng.random((size, 5))
+        latitudes = rng.uniform(SF_BOUNDS[0], SF_BOUNDS[1], size)
+        longitudes = rng.uniform(SF_BOUNDS[2], SF_BOUNDS[3], size)
+        if basis is None:
+            vectors = random_unit_vectors(rng, size, dim)
+        else:
+            vectors = low_rank_unit_vectors(rng, size, basis)
+
+        columns = {
+            "id": ids,
+            "title": titles,
+            "price": rng.integers(800, 9000, size),
+            "beds": rng.integers(0, 5, size),
+            "baths": rng.integers(1, 4, size),
+            "sqft": rng.integers(300, 3000, size),
+            "city": ["San Francisco"] * size,
+            "neighborhood": hoods,
+            "description": [
+                f"{t}. Close to transit, {w} and well kept." for t, w in zip(titles, words[:, 1])
+            ],
+            "latitude": latitudes,
+            "longitude": longitudes,
+            "geo_cell": [
+                geo_cell(lat, lon) for lat, lon in zip(latitudes.tolist(), longitudes.tolist())
+            ],
+            "pets_allowed": flags[:, 0] < 0.4,
+            "parking": flags[:, 1] < 0.3,
+            "laundry": flags[:, 2] < 0.5,
+            "air_conditioning": flags[:, 3] < 0.2,
+            "vibe_score": np.round(rng.uniform(3.0, 5.0, size), 2),
+            "location_score": np.round(rng.uniform(3.0, 5.0, size), 2),
+            "safety_score": [4.0] * size,
+            "walkability_score": np.round(rng.uniform(3.0, 5.0, size), 2),
+            "amenities": [["Wifi", "Kitchen"]] * size,
+            "images": [["https://example.com/listing.jpg"]] * size,
+            "created_at": [
+                now - timedelta(minutes=int(m)) for m in rng.integers(0, 60 * 24 * 365, size)
+            ],
+            "external_url": [f"https://example.com/{i}" for i in ids],
+            "source": ["synthetic"] * size,
+            "is_active": flags[:, 4] < 0.98,
+            "last_embedded_at": [now] * size,
+            "content_hash": [None] * size,
+            "row_hash": [None] * size,
+            "vector": pa.FixedSizeListArray.from_arrays(
+                pa.array(vectors.ravel(), pa.float32()), dim
+            ),
+        }
+        if projection is not None:
+            compact = projection.transform(vectors)
+            columns[COMPACT_COLUMN] = pa.FixedSizeListArray.from_arrays(
+                pa.array(compact.ravel(), pa.float32()), projection.dim
+            )
+        yield pa.Table.from_pydict(columns, schema=schema)
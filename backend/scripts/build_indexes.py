@@ -0,0 +1,32 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from app.db.client import get_lancedb_client
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build scalar, full-text and vector indexes on an existing listings table"
+    )
+    parser.add_argument("--scalar-only", action="store_true",
+                        help="Skip the (slower) ANN vector index")
+    args = parser.parse_args()
+
+    client = get_lancedb_client()
+    # Columns added since the table was built (e.g. geo_cell, which gets a scalar index)
+    client.ensure_schema()
+    if args.scalar_only:
+        client.create_scalar_indexes()
+        client.create_fts_indexes()
+    else:
+        client.build_indexes()
+
+    for idx in client.get_table().list_indices():
+        print(f"- {idx.name}: {idx.index_type} on {idx.columns}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import argparse
 import asyncio
+import gc
+import math
 import sys
+import time
 from pathlib import Path
 import json
 
@@ -7,7 +11,8 @@ import json
 backend_dir = Path(__file__).resolve().parent.parent
 sys.path.append(str(backend_dir))
 
-from app.tools.search import SearchListingsTool
+from app.tools.search import SearchListingsTool, get_search_cache
+from app.services.embeddings import EmbeddingService
 
 GOLDEN_SET = [
     {
@@ -88,5 +93,104 @@ async def eval_ranking():
             
         print("")
 
+def rss_mb():
+    """Resident set size of this process (Linux only)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+async def run_backend(backend, k, repeats):
+    """Load `backend`, run the golden set through the search tool and time single-query encodes."""
+    gc.collect()
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    # Swap the process-wide service so the tool (via the batcher) embeds with this backend
+    service = EmbeddingService._instance = EmbeddingService(backend=backend)
+    load_s = time.perf_counter() - started
+    rss = rss_mb() - rss_before
+
+    queries = [case["query"] for case in GOLDEN_SET]
+    service._encode(queries, is_query=True)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for q in queries:
+            service._encode([q], is_query=True)
+    encode_ms = (time.perf_counter() - started) * 1000 / (repeats * len(queries))
+
+    # Cached results are keyed by query, not by backend: without this the candidate is served
+    # the reference's results. Semantic mode, so every query is ranked by this backend's vectors
+    # (auto mode answers literal-term queries with BM25 alone).
+    get_search_cache().clear()
+    tool = SearchListingsTool()
+    ranked, vectors = [], []
+    for case in GOLDEN_SET:
+        results = await tool.execute(
+            query=case["query"], limit=k, search_mode="semantic", **case["expected_filters"]
+        )
+        ranked.append([r["id"] for r in results])
+        vectors.append(service._encode([case["query"]], is_query=True)[0])
+
+    EmbeddingService._instance = None
+    del service
+    return {
+        "load_s": load_s, "rss_mb": rss, "encode_ms": encode_ms,
+        "ranked": ranked, "vectors": vectors,
+    }
+
+async def compare_backends(reference, candidate, k, repeats, min_overlap):
+    """
+    Quality/speed gate for an alternative embedding backend: the candidate's top-k results must
+    overlap the reference backend's top-k by at least `min_overlap` on average.
+    Returns a process exit code.
+    """
+    print(f"--- Backend comparison: {candidate} vs {reference} "
+          f"(top-{k}, {len(GOLDEN_SET)} queries) ---\n")
+    ref = await run_backend(reference, k, repeats)
+    cand = await run_backend(candidate, k, repeats)
+
+    overlaps = []
+    print(f"{'query':<50}{'overlap@k':>10}{'cosine':>10}")
+    for case, ref_ids, cand_ids, ref_vec, cand_vec in zip(
+        GOLDEN_SET, ref["ranked"], cand["ranked"], ref["vectors"], cand["vectors"]
+    ):
+        overlap = len(set(ref_ids) & set(cand_ids)) / len(ref_ids) if ref_ids else 1.0
+        overlaps.append(overlap)
+        print(f"{case['query'][:48]:<50}{overlap:>10.2f}{cosine(ref_vec, cand_vec):>10.4f}")
+
+    mean_overlap = sum(overlaps) / len(overlaps)
+    print(f"\n{'backend':<12}{'load s':>10}{'RSS +MB':>10}{'encode ms':>12}")
+    for name, run in ((reference, ref), (candidate, cand)):
+        print(f"{name:<12}{run['load_s']:>10.1f}{run['rss_mb']:>10.0f}{run['encode_ms']:>12.1f}")
+    print(f"\nSpeedup: {ref['encode_ms'] / cand['encode_ms']:.2f}x, "
+          f"mean overlap@{k}: {mean_overlap:.3f} (threshold {min_overlap})")
+
+    if mean_overlap < min_overlap:
+        print("[FAIL] Candidate backend changes retrieval results too much.")
+        return 1
+    print("[PASS]")
+    return 0
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ranking evaluation on the golden set.")
+    parser.add_argument("--compare-backend", choices=EmbeddingService.BACKENDS,
+                        help="Gate an embedding backend against the reference backend instead")
+    parser.add_argument("--reference-backend", choices=EmbeddingService.BACKENDS, default="torch")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5, help="Encode timing rounds per query")
+    parser.add_argument("--min-overlap", type=float, default=0.9)
+    args = parser.parse_args()
+
+    if args.compare_backend:
+        sys.exit(asyncio.run(compare_backends(
+            args.reference_backend, args.compare_backend, args.k, args.repeats, args.min_overlap
+        )))
     asyncio.run(eval_ranking())
@@ -0,0 +1,45 @@
+"""
+Export the embedding model to ONNX plus a dynamically quantized (int8) ONNX variant.
+
+    pip install 'sentence-transformers[onnx]'
+    python scripts/export_onnx.py --output data/models/e5-large-v2-onnx --config avx512_vnni
+
+Then serve it with:
+    EMBEDDING_BACKEND=onnx
+    EMBEDDING_MODEL_PATH=data/models/e5-large-v2-onnx
+    EMBEDDING_ONNX_FILE=onnx/model_qint8_avx512_vnni.onnx
+
+and gate it against full precision before rolling out:
+    python scripts/evaluate_ranking.py --compare-backend onnx
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Fix Path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+from app.services.embeddings import EmbeddingService
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", required=True, help="Directory for the exported model")
+    parser.add_argument("--config", choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+                        default="avx512_vnni", help="Quantization config matching the target CPU")
+    args = parser.parse_args()
+
+    print(f"Exporting {EmbeddingService.MODEL_NAME} to ONNX...")
+    model = SentenceTransformer(EmbeddingService.MODEL_NAME, backend="onnx")
+    model.save(args.output)
+
+    print(f"Quantizing ({args.config})...")
+    export_dynamic_quantized_onnx_model(model, args.config, args.output)
+    print(f"Done. Set EMBEDDING_MODEL_PATH={args.output} "
+          f"EMBEDDING_ONNX_FILE=onnx/model_qint8_{args.config}.onnx")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+WebSocket load generator for /ws/{session_id}.
+
+Each virtual user creates a session, connects, and sends --turns messages one after another,
+timing every turn until the final assistant "message" frame. Reports p50/p95/p99 turn latency,
+time to first tool result / first token, turns per second, and bytes received per turn.
+
+Messages are composed from templates (a few thousand distinct searches), so almost every turn
+pays for a query embedding and a search instead of hitting the search result / embedding
+caches. --fixed-messages draws from six fixed messages instead, which after the first few turns
+measures the cached path. With --refine, every turn after the first is a follow-up like
+"make it cheaper" that the mock LLM turns into the previous search plus a filter, so most
+listings repeat between turns.
+
+Run the backend against the local mock LLM so results reflect our stack, not the provider:
+
+    python scripts/mock_llm_server.py --port 9000
+    OPENAI_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=mock uvicorn app.main:app --port 8000
+    python scripts/load_test_ws.py --url http://localhost:8000 --users 50 --turns 3
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import numpy as np
+import websockets
+from benchmark_utils import SUMMARY_HEADER, format_summary, summarize
+
+# --fixed-messages
+MESSAGES = [
+    "Pet friendly apartment in the Mission under $3500",
+    "Quiet place with parking near Golden Gate Park",
+    "Show me cheaper ones",
+    "Penthouse with a view",
+    "Two bedroom with laundry in SoMa",
+    "Anything sunny in Noe Valley?",
+]
+
+# Default: one of each, e.g. "Sunny loft near Golden Gate Park with parking"
+ADJECTIVES = ["Quiet", "Sunny", "Modern", "Spacious", "Cozy", "Bright", "Renovated", "Affordable"]
+HOMES = ["studio", "one bedroom", "two bedroom apartment", "loft", "flat", "condo"]
+PLACES = ["in the Mission", "near Golden Gate Park", "in SoMa", "in Noe Valley",
+          "near a BART station", "in the Marina", "close to downtown"]
+EXTRAS = ["", " with parking", " that allows pets", " with in-unit laundry", " under $3000",
+          " under $4500", " with a view"]
+
+def compose_message(rng: random.Random) -> str:
+    return f"{rng.choice(ADJECTIVES)} {rng.choice(HOMES)} {rng.choice(PLACES)}{rng.choice(EXTRAS)}"
+
+# Follow-ups the mock LLM merges into the previous search (REFINEMENTS in mock_llm_server.py)
+REFINE_MESSAGES = [
+    "Make it cheaper", "Only ones with parking", "Must allow pets", "With laundry please",
+]
+
+async def run_user(base_url: str, ws_url: str, turns: int, results: dict, rng: random.Random,
+                   refine: bool, fixed_messages: bool):
+    async with httpx.AsyncClient(base_url=base_url) as http:
+        response = await http.post("/sessions", json={})
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+
+    async with websockets.connect(f"{ws_url}/ws/{session_id}", max_size=None) as ws:
+        for turn in range(turns):
+            started = time.perf_counter()
+            first_result = first_token = None
+            received = 0
+            if refine and turn:
+                message = rng.choice(REFINE_MESSAGES)
+            else:
+                message = rng.choice(MESSAGES) if fixed_messages else compose_message(rng)
+            await ws.send(json.dumps({"type": "message", "content": message}))
+            while True:
+                data = await ws.recv()
+                received += len(data.encode() if isinstance(data, str) else data)
+                frame = json.loads(data)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if frame["type"] == "tool_result" and first_result is None:
+                    first_result = elapsed_ms
+                elif frame["type"] == "delta" and first_token is None:
+                    first_token = elapsed_ms
+                elif frame["type"] == "error":
+                    raise RuntimeError(frame.get("message"))
+                elif frame["type"] == "message":
+                    break
+            results["turn"].append(elapsed_ms)
+            results["bytes"].append((turn, received))
+            if first_result is not None:
+                results["first_result"].append(first_result)
+            if first_token is not None:
+                results["first_token"].append(first_token)
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per user")
+    parser.add_argument("--ramp-up", type=float, default=1.0,
+                        help="Seconds over which users connect")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--refine", action="store_true",
+                        help="Turns after the first refine the previous search")
+    parser.add_argument("--fixed-messages", action="store_true",
+                        help="Six fixed messages (mostly cache hits) instead of composed ones")
+    args = parser.parse_args()
+
+    ws_url = args.url.replace("http", "ws", 1)
+    rng = random.Random(args.seed)
+    results = {"turn": [], "first_result": [], "first_token": [], "bytes": []}
+
+    async def user(i):
+        await asyncio.sleep(args.ramp_up * i / max(1, args.users))
+        await run_user(args.url, ws_url, args.turns, results, rng, args.refine, args.fixed_messages)
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(user(i) for i in range(args.users)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors = [o for o in outcomes if isinstance(o, Exception)]
+
+    print(f"--- {args.users} users x {args.turns} turns against {args.url} ({elapsed:.1f}s) ---\n")
+    print(f"{'metric':<16}{SUMMARY_HEADER}")
+    received = results.pop("bytes")
+    for name, latencies in results.items():
+        if latencies:
+            print(f"{name:<16}{format_summary(summarize(latencies, elapsed))}")
+    print(f"\nTurns/sec: {len(results['turn']) / elapsed:.1f}, failed users: {len(errors)}")
+    first = [size for turn, size in received if turn == 0]
+    later = [size for turn, size in received if turn > 0]
+    if received:
+        print(f"Bytes/turn: first turn mean {np.mean(first):.0f}"
+              + (f", later turns mean {np.mean(later):.0f}" if later else ""))
+    for error in errors[:5]:
+        print(f"  {type(error).__name__}: {error}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""
+Local stand-in for the OpenAI chat completions API, for load tests without network/LLM cost.
+
+Behaviour per request (streaming or not):
+- last message from the user -> a search_listings tool call built from the user's text, or, for
+  a REFINEMENTS follow-up, the previous search's arguments with a filter/sort merged in
+- otherwise (tool results are in) -> a short text answer, streamed token by token
+Latency is simulated with a time-to-first-token and a per-token delay.
+
+    python scripts/mock_llm_server.py --port 9000 --ttft-ms 300 --token-ms 15
+    OPENAI_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=mock uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Mock OpenAI")
+config = {"ttft_ms": 300.0, "token_ms": 15.0, "answer_tokens": 40}
+
+ANSWER = (
+    "Here are a few places that match what you asked for. The first one looks like the best fit. "
+)
+
+# Follow-ups that refine the previous search, as the real model does
+# (STATEFUL SEARCH in SYSTEM_PROMPT)
+REFINEMENTS = {
+    "make it cheaper": {"sort_by": "price_asc"},
+    "only ones with parking": {"parking": True},
+    "must allow pets": {"pets_allowed": True},
+    "with laundry please": {"laundry": True},
+}
+
+def previous_search(messages: list[dict]) -> dict:
+    """Arguments of the latest search_listings call in the history, {} if none."""
+    for message in reversed(messages):
+        for call in reversed(message.get("tool_calls") or []):
+            if call["function"]["name"] == "search_listings":
+                return json.loads(call["function"]["arguments"] or "{}")
+    return {}
+
+def plan(messages: list[dict]) -> dict:
+    """Decide the assistant's move: a search tool call for new user input, else a text answer."""
+    last = messages[-1] if messages else {}
+    if last.get("role") == "user":
+        text = last.get("content") or ""
+        refinement = REFINEMENTS.get(text.strip().lower())
+        if refinement:
+            search = {**previous_search(messages), **refinement}
+        else:
+            search = {"query": text[:200]}
+        call_id = f"call_{uuid.uuid4().hex[:12]}"
+        arguments = json.dumps(search)
+        return {"tool_call": {"id": call_id, "name": "search_listings", "arguments": arguments}}
+    words = (ANSWER * (config["answer_tokens"] // 10 + 1)).split(" ")[:config["answer_tokens"]]
+    return {"tokens": [w + " " for w in words]}
+
+def chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    payload = {
+        "id": completion_id, "object": "chat.completion.chunk",
+        "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+async def stream(move: dict, model: str, include_usage: bool):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    await asyncio.sleep(config["ttft_ms"] / 1000)
+    if "tool_call" in move:
+        call = move["tool_call"]
+        yield chunk(completion_id, model, {"role": "assistant", "tool_calls": [{
+            "index": 0, "id": call["id"], "type": "function",
+            "function": {"name": call["name"], "arguments": ""},
+        }]})
+        # Arguments arrive in fragments, like the real API
+        args = call["arguments"]
+        for i in range(0, len(args), 16):
+            fragment = {"index": 0, "function": {"arguments": args[i:i + 16]}}
+            yield chunk(completion_id, model, {"tool_calls": [fragment]})
+        yield chunk(completion_id, model, {}, "tool_calls")
+        completion_tokens = len(args) // 4
+    else:
+        yield chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for token in move["tokens"]:
+            yield chunk(completion_id, model, {"content": token})
+            await asyncio.sleep(config["token_ms"] / 1000)
+        yield chunk(completion_id, model, {}, "stop")
+        completion_tokens = len(move["tokens"])
+    if include_usage:
+        usage = {
+            "prompt_tokens": 0, "completion_tokens": completion_tokens,
+            "total_tokens": completion_tokens,
+        }
+        payload = {"id": completion_id, "object": "chat.completion.chunk",
+                   "created": int(time.time()), "model": model, "choices": [], "usage": usage}
+        yield f"data: {json.dumps(payload)}\n\n"
+    yield "data: [DONE]\n\n"
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "mock")
+    move = plan(body.get("messages", []))
+    if body.get("stream"):
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        return StreamingResponse(
+            stream(move, model, include_usage), media_type="text/event-stream"
+        )
+
+    answer_ms = config["token_ms"] * len(move.get("tokens", []))
+    await asyncio.sleep((config["ttft_ms"] + answer_ms) / 1000)
+    if "tool_call" in move:
+        call = move["tool_call"]
+        message = {"role": "assistant", "content": None, "tool_calls": [{
+            "id": call["id"], "type": "function",
+            "function": {"name": call["name"], "arguments": call["arguments"]},
+        }]}
+        finish_reason = "tool_calls"
+    else:
+        message = {"role": "assistant", "content": "".join(move["tokens"])}
+        finish_reason = "stop"
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+        "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--ttft-ms", type=float, default=config["ttft_ms"],
+                        help="Delay before the first chunk")
+    parser.add_argument("--token-ms", type=float, default=config["token_ms"],
+                        help="Delay between answer tokens")
+    parser.add_argument("--answer-tokens", type=int, default=config["answer_tokens"])
+    args = parser.parse_args()
+    config.update(ttft_ms=args.ttft_ms, token_ms=args.token_ms, answer_tokens=args.answer_tokens)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -1,13 +1,13 @@
+import argparse
 import sys
 import os
-from datetime import datetime
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.db.client import get_lancedb_client
 from app.services.embeddings import get_embedding_service
-from app.db.schemas import Listing
+from app.db.ingest import ListingIngestor
 import structlog
 
 logger = structlog.get_logger()
@@ -21,6 +21,8 @@ DUMMY_LISTINGS = [
         "baths": 1.0,
         "city": "San Francisco",
         "neighborhood": "SoMa",
+        "latitude": 37.7786,
+        "longitude": -122.4059,
         "amenities": ["Gym", "Roof Deck", "In-unit W/D"],
         "external_url": "https://example.com/listing1",
         "description": "Stunning modern 1 bedroom apartment in the heart of SoMa. Features high ceilings, large windows, and a chef's kitchen. Building usually includes gym and roof deck."
@@ -33,6 +35,8 @@ DUMMY_LISTINGS = [
         "baths": 2.0,
         "city": "San Francisco",
         "neighborhood": "SoMa",
+        "latitude": 37.7770,
+        "longitude": -122.3947,
         "amenities": ["Parking", "Concierge"],
         "external_url": "https://example.com/listing2",
         "description": "Huge industrial loft conversion with 2 bedrooms and 2 bathrooms. Walking distance to Caltrain and Oracle Park. Concrete floors and exposed brick."
@@ -45,6 +49,8 @@ DUMMY_LISTINGS = [
         "baths": 1.0,
         "city": "San Francisco",
         "neighborhood": "SoMa",
+        "latitude": 37.7857,
+        "longitude": -122.3967,
         "amenities": ["Pool", "Gym", "Doorman"],
         "external_url": "https://example.com/listing3",
         "description": "Cozy but luxurious studio in a premier highrise. Access to pool, gym, and 24/7 doorman. Great views of the city."
@@ -57,56 +63,32 @@ DUMMY_LISTINGS = [
         "baths": 1.0,
         "city": "Oakland",
         "neighborhood": "Adams Point",
+        "latitude": 37.8118,
+        "longitude": -122.2560,
         "amenities": ["Garden", "Pets Allowed"],
         "external_url": "https://example.com/listing4",
         "description": "Lovely garden unit in a quiet fourplex. Hardwood floors and shared backyard. Pet friendly."
     }
 ]
 
-def seed_data():
+def seed_data(full_rebuild=False):
     logger.info("Starting seed process...")
     
     # Initialize services
     client = get_lancedb_client()
     embedding_service = get_embedding_service()
     
-    # Drop existing table to ensure schema update
-    try:
-        client._db.drop_table(client.TABLE_NAME)
-        logger.info("Dropped existing table")
-    except Exception as e:
-        logger.info(f"Top drop skipped/failed: {e}")
-
-    table = client.get_table()
-    
-    # Prepare data
-    data_to_insert = []
-    ids = []
-    
-    for item in DUMMY_LISTINGS:
-        logger.info(f"Processing listing: {item['title']}")
-        
-        # Embed description
-        vector = embedding_service.get_embedding(item["description"])
-        
-        listing = Listing(
-            **item,
-            vector=vector,
-            last_embedded_at=datetime.now()
-        )
-        data_to_insert.append(listing.model_dump())
-        ids.append(item["id"])
-
-    # Overwrite mode: delete existing if IDs match or just add?
-    # LanceDB doesn't strictly enforce primary key uniqueness on add easily without merge.
-    # For seed, easier to drop/recreate or just append. 
-    # Since `get_table` implementation in client creates if not exists, 
-    # we might want to drop only if we are hard resetting.
-    # For now, let's just add components.
-    
-    logger.info(f"Inserting {len(data_to_insert)} listings...")
-    table.add(data_to_insert)
-    logger.info("Seed complete!")
+    # Upsert by id: unchanged listings are skipped, edited ones re-embedded only if their
+    # description changed. No drop, so the table stays readable while seeding.
+    ingestor = ListingIngestor(client, embedding_service, source="seed", full_rebuild=full_rebuild)
+    stats = ingestor.ingest((item["description"], item) for item in DUMMY_LISTINGS)
+    logger.info(f"Seed complete! {stats}")
 
 if __name__ == "__main__":
-    seed_data()
+    parser = argparse.ArgumentParser(
+        description="Seed the listings table with a few dummy listings"
+    )
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Re-embed every listing and overwrite the table")
+    args = parser.parse_args()
+    seed_data(args.full_rebuild)
@@ -1,3 +1,4 @@
+import argparse
 import csv
 import json
 import logging
@@ -13,7 +14,7 @@ sys.path.append(str(backend_dir))
 # print(f"Added {backend_dir} to sys.path")
 
 from app.db.client import LanceDBClient
-from app.db.schemas import Listing
+from app.db.ingest import ListingIngestor
 from app.services.embeddings import EmbeddingService
 
 # Configure logging
@@ -23,6 +24,8 @@ logger = logging.getLogger(__name__)
 import re # Added import
 
 CSV_PATH = "/Users/henrytran/Downloads/listings.csv"
+DEFAULT_CHUNK_SIZE = 256
+SOURCE = "airbnb"
 
 def clean_text(text):
     if not text: return ""
@@ -66,54 +69,44 @@ def clean_score(score_str):
     except:
         return 0.0
 
-def seed():
-    logger.info("Initializing DB and Embeddings...")
-    client = LanceDBClient()
-    embedder = EmbeddingService()
-    
-    # Drop existing table to start fresh with new schema
+def parse_coordinate(value):
     try:
-        client._db.drop_table(client.TABLE_NAME)
-        logger.info("Dropped existing table")
-    except:
-        pass
-        
-    # Re-create table
-    table = client.get_table() # This will create it with new schema
-    
-    logger.info(f"Reading CSV from {CSV_PATH}...")
-    
-    listings_to_insert = []
-    
-    with open(CSV_PATH, 'r', encoding='utf-8') as f:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def iter_listing_rows(csv_path):
+    """
+    Stream the CSV one row at a time, yielding (text_to_embed, listing_fields)
+    for every row that passes our filters. Nothing is accumulated here.
+    """
+    with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        
-        for i, row in enumerate(reader):
+
+        for row in reader:
             # Filters
             if row['room_type'] != "Entire home/apt":
                 continue
-            
+
             # Host location filter - loose match
             if "San Francisco" not in row.get('host_location', ''):
                 continue
-                
-            # Basic data
-            amenities_list = parse_amenities(row.get('amenities', '[]'))
-            bools = derive_booleans(amenities_list)
-            
-            # Helper to clean text
-            raw_desc = f"{row.get('name', '')}. {row.get('description', '')}. {row.get('neighborhood_overview', '')}"
-            cleaned_desc = clean_text(raw_desc)
-            cleaned_desc = cleaned_desc[:2000]
-            
+
             try:
+                # Basic data
+                amenities_list = parse_amenities(row.get('amenities', '[]'))
+                bools = derive_booleans(amenities_list)
+
+                # Helper to clean text
+                raw_desc = (f"{row.get('name', '')}. {row.get('description', '')}. "
+                            f"{row.get('neighborhood_overview', '')}")
+                cleaned_desc = clean_text(raw_desc)
+                cleaned_desc = cleaned_desc[:2000]
+
                 # Combined text for embedding (Passage)
                 text_to_embed = f"{row.get('name')} {cleaned_desc}"
-                
-                # Generate Vector (is_query=False for passages)
-                vector = embedder.get_embedding(text_to_embed, is_query=False)
-                
-                listing = Listing(
+
+                fields = dict(
                     id=row['id'],
                     title=row['name'] or "Untitled Listing",
                     price=parse_price(row['price']),
@@ -123,43 +116,58 @@ def seed():
                     city="San Francisco",
                     neighborhood=row.get('neighbourhood_cleansed') or "San Francisco",
                     description=cleaned_desc, # Store cleaned description
-                    
+                    latitude=parse_coordinate(row.get('latitude')),
+                    longitude=parse_coordinate(row.get('longitude')),
+
                     pets_allowed=bools['pets_allowed'],
                     parking=bools['parking'],
                     laundry=bools['laundry'],
                     air_conditioning=bools['air_conditioning'],
-                    
+
                     vibe_score=clean_score(row.get('review_scores_rating', '0')),
                     location_score=clean_score(row.get('review_scores_location', '0')),
                     safety_score=4.0, # Placeholder
                     walkability_score=clean_score(row.get('review_scores_location', '0')), # Proxy
-                    
+
                     amenities=amenities_list[:10], # Keep top 10 to save space
                     images=[row.get('picture_url', '')],
                     created_at=datetime.now(),
-                    
-                    vector=vector,
+
                     external_url=row.get('listing_url', '')
                 )
-                
-                listings_to_insert.append(listing.model_dump())
-                
-                if i % 100 == 0: # Log progress
-                    logger.info(f"Processed {i} listings for embedding...")
-                    
             except Exception as e:
                 logger.warning(f"Skipping row {row.get('id')}: {e}")
                 continue
 
-    # 3. Create Table (OVERWRITE to clean up old indices/schema)
-    if listings_to_insert:
-        logger.info(f"Inserting {len(listings_to_insert)} listings into '{client.TABLE_NAME}' table (OVERWRITE mode)...")
-        # Use client._db.create_table with mode='overwrite'
-        table = client._db.create_table(client.TABLE_NAME, listings_to_insert, mode="overwrite")
-        logger.info("Table created/overwritten.")
-        logger.info("Done!")
-    else:
+            yield text_to_embed, fields
+
+def seed(csv_path=CSV_PATH, chunk_size=DEFAULT_CHUNK_SIZE, full_rebuild=False):
+    logger.info("Initializing DB and Embeddings...")
+    client = LanceDBClient()
+    embedder = EmbeddingService()
+
+    logger.info(f"Streaming CSV from {csv_path} in chunks of {chunk_size}...")
+    # Incremental by default: only new/changed listings are embedded and written, listings
+    # missing from the CSV are deactivated, and the live table stays readable throughout
+    ingestor = ListingIngestor(
+        client, embedder, source=SOURCE, chunk_size=chunk_size, full_rebuild=full_rebuild
+    )
+    stats = ingestor.ingest(iter_listing_rows(csv_path))
+
+    if not stats.seen:
         logger.warning("No listings found matching criteria!")
+        return
+    logger.info("Done!")
 
 if __name__ == "__main__":
-    seed()
+    parser = argparse.ArgumentParser(
+        description="Seed the listings table from an Airbnb listings.csv dump"
+    )
+    parser.add_argument("--csv", default=CSV_PATH, help="Path to listings.csv")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows embedded and written per batch")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Re-embed every listing and overwrite the table "
+                             "(e.g. after a schema change)")
+    args = parser.parse_args()
+    seed(args.csv, args.chunk_size, args.full_rebuild)
@@ -21,7 +21,7 @@ async def main():
     
     print(f"\nFound {len(results)} results:")
     for res in results:
-        print(f"- {res['title']} (${res['price']}): {res['description'][:50]}...")
+        print(f"- {res['title']} (${res['price']}): {res['neighborhood']}")
 
 if __name__ == "__main__":
     asyncio.run(main())
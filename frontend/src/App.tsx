@@ -14,7 +14,12 @@ interface ToolCall {
 interface ToolResult {
   type: 'tool_result'
   tool_name: string
-  result: any
+  result?: any
+  // Delta listing results: the ordered ids, per-query fields (scores, distance_km)
+  // as columns along the ids, and only the listings not sent before
+  ids?: string[]
+  listings?: Listing[]
+  extras?: Record<string, any[]>
 }
 
 interface Message {
@@ -22,6 +27,7 @@ interface Message {
   content?: string
   tool_calls?: ToolCall[]
   tool_results?: ToolResult[]
+  streaming?: boolean
 }
 
 interface Listing {
@@ -53,6 +59,29 @@ function App() {
   // We'll extract listings from tool results to show on the right
   const [activeListings, setActiveListings] = useState<Listing[]>([])
 
+  // Every listing the server has sent on this connection, by id. Delta tool_result
+  // frames only carry new/changed listings and reference the rest by id.
+  const listingCache = useRef<Map<string, Listing>>(new Map())
+
+  const resolveResult = (data: ToolResult) => {
+    if (!data.ids) {
+      return data.result
+    }
+    for (const listing of data.listings || []) {
+      listingCache.current.set(listing.id, listing)
+    }
+    return data.ids
+      .map((id, i) => {
+        const listing = listingCache.current.get(id)
+        if (!listing) {
+          return undefined
+        }
+        const extras = Object.entries(data.extras || {}).filter(([, values]) => values[i] != null)
+        return { ...listing, ...Object.fromEntries(extras.map(([field, values]) => [field, values[i]])) }
+      })
+      .filter((listing): listing is Listing => !!listing)
+  }
+
   // Initialize Session
   useEffect(() => {
     const initSession = async () => {
@@ -66,43 +95,63 @@ function App() {
     initSession()
   }, [])
 
+  // Handle Incoming Messages
+  // Every frame goes through onMessage: token deltas arrive in bursts and
+  // lastJsonMessage would only surface the last one per render.
+  const handleFrame = (data: any) => {
+    if (data.type === 'status') {
+      setStatus(data.message)
+    } else if (data.type === 'delta') {
+      setStatus('')
+      setMessages(prev => {
+        const last = prev[prev.length - 1]
+        if (last && last.streaming) {
+          return [...prev.slice(0, -1), { ...last, content: (last.content || '') + data.content }]
+        }
+        return [...prev, { role: 'assistant', content: data.content, streaming: true }]
+      })
+    } else if (data.type === 'message') {
+      setStatus('')
+      setMessages(prev => {
+        const last = prev[prev.length - 1]
+        if (last && last.streaming) {
+          return [...prev.slice(0, -1), { role: data.role, content: data.content }]
+        }
+        return [...prev, { role: data.role, content: data.content }]
+      })
+    } else if (data.type === 'tool_call') {
+      // Any text streamed before a tool call is complete
+      setMessages(prev => {
+        const last = prev[prev.length - 1]
+        return last && last.streaming ? [...prev.slice(0, -1), { ...last, streaming: false }] : prev
+      })
+      setStatus(`Executing tool: ${data.tool_name}...`)
+    } else if (data.type === 'tool_result') {
+      const result = resolveResult(data)
+      if (data.tool_name === 'search_listings') {
+        // Add tool result to messagse for history tracking (optional display)
+        // setMessages(prev => [...prev, { role: 'assistant', tool_results: [data] }])
+
+        // CRITICAL: Update the "Active Listings" on the right panel
+        if (Array.isArray(result) && result.length > 0) {
+          setActiveListings(result)
+        }
+      }
+      setStatus('')
+    }
+  }
+
   // WebSocket
-  const { sendMessage, lastJsonMessage, readyState } = useWebSocket(
+  const { sendMessage, readyState } = useWebSocket(
     sessionId ? `ws://localhost:8000/ws/${sessionId}` : null,
     {
       shouldReconnect: () => true,
+      onMessage: (event) => handleFrame(JSON.parse(event.data)),
     }
   )
 
   const messagesEndRef = useRef<HTMLDivElement>(null)
 
-  // Handle Incoming Messages
-  useEffect(() => {
-    if (lastJsonMessage !== null) {
-      const data = lastJsonMessage as any
-
-      if (data.type === 'status') {
-        setStatus(data.message)
-      } else if (data.type === 'message') {
-        setStatus('')
-        setMessages(prev => [...prev, { role: data.role, content: data.content }])
-      } else if (data.type === 'tool_call') {
-        setStatus(`Executing tool: ${data.tool_name}...`)
-      } else if (data.type === 'tool_result') {
-        if (data.tool_name === 'search_listings') {
-          // Add tool result to messagse for history tracking (optional display)
-          // setMessages(prev => [...prev, { role: 'assistant', tool_results: [data] }])
-
-          // CRITICAL: Update the "Active Listings" on the right panel
-          if (Array.isArray(data.result) && data.result.length > 0) {
-            setActiveListings(data.result)
-          }
-        }
-        setStatus('')
-      }
-    }
-  }, [lastJsonMessage])
-
   // Scroll to bottom
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })